@@ -34,6 +34,7 @@ _GH_RELEASES_URL = (
     f"https://api.github.com/repos/{_GH_OWNER}/{_GH_REPO}/releases/latest"
 )
 _HTTP_TIMEOUT = 20
+_VER_RX = re.compile(r"(\d+)\.(\d+)\.(\d+)")
 _INSTALLER_ASSET_NAME = "TSM-Installer.exe"
 _CHANGELOG_RAW_URL = (
     f"https://raw.githubusercontent.com/{_GH_OWNER}/{_GH_REPO}/master/CHANGELOG.md"
@@ -58,7 +59,7 @@ def _ssl_context() -> ssl.SSLContext:
 
 def _ver_tuple(v: str) -> tuple[int, ...]:
     """Parse a version string into a comparable tuple, ignoring pre-release suffixes."""
-    m = re.search(r"(\d+)\.(\d+)\.(\d+)", v)
+    m = _VER_RX.search(v)
     if m:
         return (int(m.group(1)), int(m.group(2)), int(m.group(3)))
     return (0, 0, 0)
@@ -25,6 +25,7 @@ import logging.handlers
 import os
 import signal
 import sys
+import threading
 
 # --- Early parse: extract --data-dir so env is set before config loads ---
 _pre = argparse.ArgumentParser(add_help=False)
@@ -36,7 +37,7 @@ if _early.data_dir:
 
 # Now safe to import config and app modules
 from config import BACKUP_DIR, LOG_DIR, LOG_LEVEL  # noqa: E402
-from tsm.app import create_app  # noqa: E402
+from tsm.app import create_app, warm_templates  # noqa: E402
 from tsm.backup_manager import BackupManager  # noqa: E402
 from tsm.db import engine  # noqa: E402
 from tsm.self_update import (  # noqa: E402
@@ -82,6 +83,7 @@ class Runner:
         self.port = port
         self.dev = dev
         self.app = create_app()
+        log.info("Compiled %d templates.", warm_templates(self.app))
         self._backup: BackupManager | None = None
         self._stopping = False
         self._server = None
@@ -225,6 +227,22 @@ def parse_args():
     return parser.parse_args()
 
 
+def _startup_update_check():
+    """Run the self-update check off the main thread.
+
+    ``check_for_update`` holds a lock while it checks and swaps the EXE,
+    so an in-app "update now" issued meanwhile is skipped instead of
+    racing it.  When an update is applied, a service restart has already
+    been scheduled, so the server only has to keep running until it is
+    stopped.
+    """
+    try:
+        if check_for_update():
+            log.info("Update applied — service will restart shortly.")
+    except Exception as e:
+        log.warning("Self-update check failed: %s", e, exc_info=True)
+
+
 def main():
     args = parse_args()
 
@@ -284,12 +302,12 @@ def main():
                 SessionLocal.remove()
 
             if auto:
-                updated = check_for_update()
-                if updated:
-                    log.info(
-                        "Update applied — service will restart. "
-                        "Exiting current process.")
-                    sys.exit(0)
+                # The check is network-bound (GitHub API + download), so
+                # run it alongside app start-up instead of before it.
+                threading.Thread(
+                    target=_startup_update_check,
+                    name="TSM-update-check", daemon=True,
+                ).start()
             else:
                 log.info("Auto-update disabled in settings — "
                          "skipping startup update check.")
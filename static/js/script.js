@@ -504,17 +504,39 @@
     if (!input || !form) return;
 
     var timer = null;
+    var pending = false;                 // a navigation is already under way
+    var lastQuery = input.value.trim();  // query the current page was rendered for
+
+    function submitOnce() {
+      if (pending) return;
+      pending = true;
+      form.submit();
+    }
 
     input.addEventListener('input', function () {
       clearTimeout(timer);
       timer = setTimeout(function () {
-        form.submit();
+        // Typing and deleting back to the same term needs no new request
+        if (input.value.trim() === lastQuery) return;
+        submitOnce();
       }, DEBOUNCE_MS);
     });
 
     // Clear the pending timer if the user submits manually (Enter / button)
-    form.addEventListener('submit', function () {
+    // and swallow repeated submits while the first request is in flight.
+    form.addEventListener('submit', function (e) {
       clearTimeout(timer);
+      if (pending) {
+        e.preventDefault();
+        return;
+      }
+      pending = true;
+    });
+
+    // Page restored from the back/forward cache: allow searching again
+    window.addEventListener('pageshow', function () {
+      pending = false;
+      lastQuery = input.value.trim();
     });
   });
 })();
@@ -22,6 +22,12 @@ class TestCreateApp:
     def test_testing_mode(self, app):
         assert app.config["TESTING"] is True
 
+    def test_warm_templates_fills_cache(self, app):
+        from tsm.app import warm_templates
+        count = warm_templates(app)
+        assert count >= 1
+        assert len(app.jinja_env.cache) >= count
+
 
 class TestLogRotation:
     """Verify that run.py wires up a RotatingFileHandler with sensible limits.
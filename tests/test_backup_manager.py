@@ -1,12 +1,23 @@
 """Tests for tsm/backup_manager.py — backup, CSV and XLSX export."""
 import os
+import sqlite3
 import tempfile
-import time
+from datetime import UTC, datetime, timedelta
 
-from tsm.models import WheelSet, AuditLog
+from tsm.models import WheelSet, AuditLog, Settings
 from tsm.backup_manager import BackupManager, export_csv_snapshot, export_xlsx_snapshot
 
 
+class _TickingClock(datetime):
+    """datetime whose now() advances one second per call."""
+    _now = datetime(2026, 1, 1, tzinfo=UTC)
+
+    @classmethod
+    def now(cls, tz=None):
+        cls._now += timedelta(seconds=1)
+        return cls._now
+
+
 class TestExportCsv:
     def test_creates_csv(self, db_session, db_engine, seed_wheelset,
                          monkeypatch):
@@ -51,6 +62,94 @@ class TestBackupManager:
             assert len(db_files) >= 1
             assert len(csv_files) >= 1
 
+    def test_perform_backup_audits_in_one_commit(self, db_session, db_engine,
+                                                 seed_wheelset, seed_settings,
+                                                 monkeypatch):
+        """Snapshot and backup audit entries are committed together."""
+        from sqlalchemy import event
+        with tempfile.TemporaryDirectory() as tmpdir:
+            import tsm.backup_manager as bm_mod
+            monkeypatch.setattr(bm_mod, "SessionLocal", db_session)
+            commits = []
+
+            def _count(conn):
+                commits.append(1)
+
+            event.listen(db_engine, "commit", _count)
+            try:
+                BackupManager(db_engine, tmpdir).perform_backup()
+            finally:
+                event.remove(db_engine, "commit", _count)
+            assert len(commits) == 1
+            actions = {a for (a,) in db_session.query(AuditLog.action)}
+            assert {"backup", "backup_csv", "backup_xlsx"} <= actions
+
+    def test_stop_ends_run_promptly(self, db_session, db_engine,
+                                    seed_settings, monkeypatch):
+        """stop() must wake the scheduler instead of waiting out the poll."""
+        import tsm.backup_manager as bm_mod
+        monkeypatch.setattr(bm_mod, "SessionLocal", db_session)
+        mgr = BackupManager(db_engine, "unused")
+        monkeypatch.setattr(mgr, "_backup_interval", lambda: 60)
+        mgr.start()
+        mgr.stop()
+        mgr.join(timeout=2)
+        assert not mgr.is_alive()
+
+    def test_settings_change_reschedules(self, db_engine, monkeypatch):
+        """A shorter interval takes effect without waiting out the old one."""
+        import threading
+        mgr = BackupManager(db_engine, "unused")
+        interval = {"minutes": 60}
+        ran = threading.Event()
+        monkeypatch.setattr(mgr, "_backup_interval", lambda: interval["minutes"])
+        monkeypatch.setattr(mgr, "perform_backup", ran.set)
+        mgr._last_run = datetime.now(UTC) - timedelta(minutes=5)
+        mgr.start()
+        try:
+            assert not ran.wait(0.2)
+            interval["minutes"] = 1
+            mgr.notify_settings_changed()
+            assert ran.wait(2)
+        finally:
+            mgr.stop()
+            mgr.join(timeout=2)
+        assert not mgr.is_alive()
+
+    def test_backup_interval_cached(self, db_session, db_engine,
+                                    seed_settings, monkeypatch):
+        """The interval is read once and reused until the TTL expires."""
+        import tsm.backup_manager as bm_mod
+        monkeypatch.setattr(bm_mod, "SessionLocal", db_session)
+        mgr = BackupManager(db_engine, "unused")
+        assert mgr._backup_interval() == 60
+        db_session.query(Settings).update({"backup_interval_minutes": 15})
+        db_session.commit()
+        assert mgr._backup_interval() == 60
+        monkeypatch.setattr(bm_mod, "_SETTINGS_TTL", 0)
+        assert mgr._backup_interval() == 15
+
+    def test_db_backup_contains_data(self, db_session, db_engine,
+                                     seed_wheelset, seed_settings,
+                                     monkeypatch):
+        """The stepped online backup must produce a complete copy."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            import tsm.backup_manager as bm_mod
+            monkeypatch.setattr(bm_mod, "SessionLocal", db_session)
+            monkeypatch.setattr(bm_mod, "_BACKUP_STEP_PAGES", 1)
+            monkeypatch.setattr(bm_mod, "_BACKUP_STEP_SLEEP", 0)
+
+            BackupManager(db_engine, tmpdir).perform_backup()
+
+            bfile = next(f for f in os.listdir(tmpdir) if f.endswith(".db"))
+            con = sqlite3.connect(os.path.join(tmpdir, bfile))
+            try:
+                rows = con.execute(
+                    "SELECT customer_name FROM wheel_sets").fetchall()
+            finally:
+                con.close()
+            assert rows == [("Max Mustermann",)]
+
     def test_retention(self, db_session, db_engine, seed_wheelset,
                        seed_settings, monkeypatch):
         """Backup manager should respect retention (backup_copies)."""
@@ -84,10 +183,12 @@ class TestBackupManager:
             seed_settings.backup_copies = 2
             db_session.commit()
 
+            # Unique second-resolution timestamps without sleeping
+            monkeypatch.setattr(bm_mod, "datetime", _TickingClock)
+
             mgr = BackupManager(db_engine, tmpdir)
             for _ in range(4):
                 mgr.perform_backup()
-                time.sleep(1)  # ensure unique second-resolution timestamps
 
             # The filenames are timestamp-sorted; the two survivors must be
             # the last two when sorted alphabetically (newest timestamps).
@@ -215,6 +316,24 @@ class TestBackupManager:
             title = str(ws.cell(row=1, column=1).value or "")
             assert "Bestand" in title or "Reifenlager" in title
 
+    def test_xlsx_print_layout(self, db_session, db_engine, seed_wheelset,
+                               monkeypatch):
+        """Streamed XLSX must keep merged headings and the print setup."""
+        import openpyxl
+        with tempfile.TemporaryDirectory() as tmpdir:
+            target = os.path.join(tmpdir, "test.xlsx")
+            import tsm.backup_manager as bm_mod
+            monkeypatch.setattr(bm_mod, "SessionLocal", db_session)
+            export_xlsx_snapshot(target)
+            wb = openpyxl.load_workbook(target)
+            ws = wb.active
+            merged = {str(r) for r in ws.merged_cells.ranges}
+            assert "A1:L1" in merged
+            assert "A4:L4" in merged  # first section header
+            assert ws.page_setup.orientation == "landscape"
+            assert ws.sheet_properties.pageSetUpPr.fitToPage is True
+            assert ws.column_dimensions["C"].width == 24
+
     def test_xlsx_audit_log_created(self, db_session, db_engine, seed_wheelset,
                                     monkeypatch):
         """export_xlsx_snapshot must write one backup_xlsx audit log entry."""
@@ -5,11 +5,13 @@ Tests for real database interactions:
 - Settings read/write/defaults
 - DisabledPosition enable/disable round-trips
 - Schema migration (_migrate) adds missing columns
+- Connection pragmas applied by tsm.db.set_sqlite_pragma
 """
 import json
 import pytest
 from sqlalchemy.exc import IntegrityError
 from tsm.models import WheelSet, Settings, AuditLog, DisabledPosition
+from tsm.db import log_action
 from tsm.positions import disable_position, enable_position
 
 
@@ -147,6 +149,17 @@ class TestAuditLog:
                    .filter_by(action="create").all())
         assert len(creates) == 2
 
+    def test_log_action_joins_caller_transaction(self, db_session):
+        log_action(db_session, "pending", None, "x")
+        db_session.rollback()
+        assert db_session.query(AuditLog).filter_by(
+            action="pending").count() == 0
+
+        log_action(db_session, "kept", None, "x")
+        db_session.commit()
+        assert db_session.query(AuditLog).filter_by(
+            action="kept").count() == 1
+
 
 # ──────────────────────────────────────────────────────────────────────
 # Settings
@@ -381,3 +394,38 @@ class TestSchemaMigration:
             assert wrow[2] == "A1ROL"
             assert wrow[3] is None  # new column defaults to NULL
         eng.dispose()
+
+
+# ──────────────────────────────────────────────────────────────────────
+# Connection pragmas
+# ──────────────────────────────────────────────────────────────────────
+class TestSqlitePragmas:
+    """The production engine must apply its tuning pragmas per connection."""
+
+    def _pragma(self, name):
+        from sqlalchemy import text
+        from tsm.db import engine
+        with engine.connect() as conn:
+            return conn.execute(text(f"PRAGMA {name}")).scalar()
+
+    def test_wal_journal(self):
+        assert self._pragma("journal_mode") == "wal"
+
+    def test_synchronous_normal(self):
+        assert self._pragma("synchronous") == 1  # NORMAL
+
+    def test_busy_timeout(self):
+        assert self._pragma("busy_timeout") == 5000
+
+    def test_temp_store_memory(self):
+        assert self._pragma("temp_store") == 2  # MEMORY
+
+    def test_cache_size(self):
+        assert self._pragma("cache_size") == -65536
+
+    def test_secure_delete_kept(self):
+        assert self._pragma("secure_delete") == 1
+
+    def test_mmap_size(self):
+        # Builds compiled with SQLITE_MAX_MMAP_SIZE=0 report 0 here
+        assert self._pragma("mmap_size") in (268435456, 0)
@@ -10,6 +10,7 @@ from tsm.i18n import (
     SUPPORTED_LOCALES,
     DEFAULT_LOCALE,
     _CATALOGUE,
+    _RESOLVED,
     get_locale,
     gettext,
     _,
@@ -47,6 +48,14 @@ def test_no_empty_strings():
     assert not empty, f"Empty translation strings: {empty}"
 
 
+def test_resolved_tables_match_catalogue():
+    """Pre-resolved lookup tables must cover every key in every locale."""
+    for locale in SUPPORTED_LOCALES:
+        assert _RESOLVED[locale].keys() == _CATALOGUE.keys()
+        for key, entry in _CATALOGUE.items():
+            assert _RESOLVED[locale][key] == entry[locale]
+
+
 def test_default_locale():
     assert DEFAULT_LOCALE == "de"
 
@@ -199,3 +208,20 @@ def test_settings_post_invalid_language_falls_back_to_de(client, seed_settings):
         follow_redirects=True,
     )
     assert resp.status_code == 200
+
+
+def test_settings_post_updates_cached_locale(app, client, seed_settings):
+    """Saving the language must update the cached locale used per request."""
+    assert app.config["_TSM_LOCALE"] == "de"
+    client.post(
+        "/settings",
+        data={
+            "_csrf_token": _csrf(client),
+            "backup_interval_minutes": "60",
+            "backup_copies": "10",
+            "language": "en",
+        },
+    )
+    assert app.config["_TSM_LOCALE"] == "en"
+    resp = client.get("/settings")
+    assert b'lang="en"' in resp.data
@@ -10,6 +10,7 @@ from tsm.positions import (
     is_usable_position,
     first_free_position,
     free_positions,
+    get_blocked_positions,
     get_effective_positions,
     save_custom_positions,
     reset_custom_positions,
@@ -18,7 +19,7 @@ from tsm.positions import (
     RE_CONTAINER,
     RE_GARAGE,
 )
-from tsm.models import Settings
+from tsm.models import DisabledPosition, Settings
 
 
 # ── Validation ─────────────────────────────────────────
@@ -69,6 +70,11 @@ class TestAllPositions:
         for p in ALL_POSITIONS:
             assert is_valid_position(p), f"{p} should be valid"
 
+    def test_lookup_is_exact(self):
+        assert isinstance(ALL_POSITIONS, frozenset)
+        assert not is_valid_position("C1ROM\n")
+        assert not is_valid_position("c1rom")
+
     def test_sorted_same_length(self):
         assert len(SORTED_POSITIONS) == len(ALL_POSITIONS)
 
@@ -92,6 +98,12 @@ class TestSorting:
         assert position_sort_key("C1ROL") < position_sort_key("C1RML")
         assert position_sort_key("C1RML") < position_sort_key("C1RUL")
 
+    def test_unknown_codes_sort_after_known(self):
+        """Codes outside the generated table still get a regex-based key."""
+        assert position_sort_key("C9XYZ") == (0, 999, 9, 9, 9)
+        assert position_sort_key("X1") == (1, 999, 9, 9)
+        assert position_sort_key("C4LUR") < position_sort_key("C9XYZ")
+
 
 # ── DB-dependent functions ─────────────────────────────
 class TestOccupied:
@@ -127,11 +139,22 @@ class TestDisabled:
     def test_enable_nonexistent(self, db_session):
         assert enable_position(db_session, "C1ROL") is False
 
+    def test_enable_drops_loaded_row(self, db_session):
+        disable_position(db_session, "C1ROL")
+        assert db_session.get(DisabledPosition, "C1ROL") is not None
+        assert enable_position(db_session, "C1ROL") is True
+        assert db_session.get(DisabledPosition, "C1ROL") is None
+
     def test_is_usable(self, db_session):
         assert is_usable_position(db_session, "C1ROL") is True
         disable_position(db_session, "C1ROL")
         assert is_usable_position(db_session, "C1ROL") is False
 
+    def test_usable_with_precomputed_disabled(self, db_session):
+        assert is_usable_position(db_session, "C1ROL", {"C1ROL"}) is False
+        assert is_usable_position(db_session, "C1ROM", {"C1ROL"}) is True
+        assert is_usable_position(db_session, "nope", set()) is False
+
 
 class TestFreePositions:
     def test_all_free_empty_db(self, db_session):
@@ -154,6 +177,19 @@ class TestFreePositions:
         assert first not in fp
         assert first_free_position(db_session) == SORTED_POSITIONS[1]
 
+    def test_blocked_positions_union(self, db_session, seed_wheelset):
+        disable_position(db_session, "GR1OL")
+        assert get_blocked_positions(db_session) == {"C1ROM", "GR1OL"}
+        fp = free_positions(db_session)
+        assert "C1ROM" not in fp and "GR1OL" not in fp
+        assert len(fp) == len(ALL_POSITIONS) - 2
+
+    def test_precomputed_sets_are_used(self, db_session):
+        """Passed-in collections replace the DB lookups, order is kept."""
+        fp = free_positions(db_session, occupied={"B"}, disabled={"C"},
+                            effective=["D", "C", "B", "A"])
+        assert fp == ["D", "A"]
+
 
 # ── Custom positions ───────────────────────────────────
 class TestCustomPositions:
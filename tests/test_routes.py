@@ -1,5 +1,7 @@
 """Tests for tsm/routes.py — all Flask routes via test client."""
+import re
 from unittest.mock import patch
+from tsm.i18n import gettext
 from tsm.models import WheelSet, Settings, AuditLog
 
 
@@ -9,6 +11,24 @@ class TestIndex:
         assert resp.status_code == 200
         assert b"Reifenmanager" in resp.data or resp.status_code == 200
 
+    def test_session_released_after_request(self, app, client, db_session,
+                                            monkeypatch):
+        """The per-request session is removed on app-context teardown."""
+        removed = []
+        monkeypatch.setattr(db_session, "remove", lambda: removed.append(1))
+        assert client.get("/").status_code == 200
+        assert removed == [1]
+
+    def test_session_released_when_hook_short_circuits(
+            self, app, client, db_session, monkeypatch):
+        """Cleanup must not depend on other before_request hooks running."""
+        removed = []
+        monkeypatch.setattr(db_session, "remove", lambda: removed.append(1))
+        app.before_request_funcs.setdefault(None, []).insert(
+            0, lambda: ("early", 503))
+        assert client.get("/").status_code == 503
+        assert removed == [1]
+
     def test_stat_cards_present(self, client):
         resp = client.get("/")
         assert resp.status_code == 200
@@ -38,6 +58,17 @@ class TestIndex:
         resp = client.get("/")
         assert b"AB-CD 1234" in resp.data
 
+    def test_total_counts_wheelsets(self, client, db_session, seed_wheelset):
+        db_session.add(WheelSet(customer_name="Erika Musterfrau",
+                                license_plate="EF-GH 5678",
+                                car_type="Audi A4",
+                                storage_position="C1ROL"))
+        db_session.commit()
+        resp = client.get("/")
+        # Compare visible text only: the count sits right before its label.
+        text = " ".join(re.sub(r"<[^>]+>", " ", resp.get_data(as_text=True)).split())
+        assert f"2 {gettext('index_total')}" in text
+
     def test_top_cars_empty_state(self, client):
         resp = client.get("/")
         assert resp.status_code == 200
@@ -376,26 +407,28 @@ class TestDeleteWheelset:
         assert resp.status_code == 200
 
     def test_delete_wrong_plate(self, client, seed_wheelset):
+        wid = seed_wheelset.id
         token = _get_csrf(client)
         resp = client.post(
-            f"/wheelsets/{seed_wheelset.id}/delete",
+            f"/wheelsets/{wid}/delete",
             data={"_csrf_token": token, "confirm_plate": "WRONG"},
             follow_redirects=True,
         )
         assert resp.status_code == 200
 
     def test_delete_success(self, client, seed_wheelset, db_session):
+        wid, plate = seed_wheelset.id, seed_wheelset.license_plate
         token = _get_csrf(client)
         resp = client.post(
-            f"/wheelsets/{seed_wheelset.id}/delete",
+            f"/wheelsets/{wid}/delete",
             data={
                 "_csrf_token": token,
-                "confirm_plate": seed_wheelset.license_plate,
+                "confirm_plate": plate,
             },
             follow_redirects=True,
         )
         assert resp.status_code == 200
-        assert db_session.get(WheelSet, seed_wheelset.id) is None
+        assert db_session.get(WheelSet, wid) is None
 
 
 class TestPositions:
@@ -403,6 +436,18 @@ class TestPositions:
         resp = client.get("/positions")
         assert resp.status_code == 200
 
+    def test_next_free_skips_occupied_and_disabled(self, client, db_session):
+        from tsm.positions import SORTED_POSITIONS, disable_position
+        db_session.add(WheelSet(customer_name="A", license_plate="X-1",
+                                car_type="VW",
+                                storage_position=SORTED_POSITIONS[0]))
+        db_session.commit()
+        disable_position(db_session, SORTED_POSITIONS[1])
+        expected = SORTED_POSITIONS[2]
+        for url in ("/", "/positions"):
+            html = client.get(url).data.decode()
+            assert f"suggested={expected}" in html
+
 
 class TestSettings:
     def test_get(self, client, seed_settings):
@@ -423,6 +468,19 @@ class TestSettings:
         assert s.backup_interval_minutes == 30
         assert s.backup_copies == 5
 
+    def test_post_wakes_backup_scheduler(self, client, seed_settings,
+                                         monkeypatch):
+        import tsm.routes as routes_mod
+        calls = []
+        monkeypatch.setattr(routes_mod, "notify_settings_changed",
+                            lambda: calls.append(1))
+        client.post("/settings", data={
+            "_csrf_token": _get_csrf(client),
+            "backup_interval_minutes": "15",
+            "backup_copies": "5",
+        })
+        assert calls == [1]
+
     def test_post_toggle_dark_mode_on(
         self, client, seed_settings, db_session
     ):
@@ -553,6 +611,40 @@ class TestBackups:
         assert resp.status_code == 200
         assert b"XLSX" in resp.data
 
+    def test_backups_listing_cached_until_dir_changes(self, client, tmp_path,
+                                                      monkeypatch):
+        """Unchanged backup dir must reuse the cached listing."""
+        import tsm.routes as routes_mod
+        monkeypatch.setattr(routes_mod, "BACKUP_DIR", str(tmp_path))
+        (tmp_path / "wheel_storage_20260402-120000.csv").write_bytes(b"x")
+        first = routes_mod._list_backup_groups()
+        assert routes_mod._list_backup_groups() is first
+        (tmp_path / "wheel_storage_20260403-120000.csv").write_bytes(b"x")
+        second = routes_mod._list_backup_groups()
+        assert [g["ts"] for g in second] == ["20260403-120000",
+                                             "20260402-120000"]
+
+    def test_backup_manager_built_once(self, app, db_engine):
+        """The app carries one BackupManager bound to its engine."""
+        from config import BACKUP_DIR
+        mgr = app.extensions["tsm_backup_mgr"]
+        assert mgr.engine is db_engine
+        assert mgr.backup_dir == BACKUP_DIR
+        assert not mgr.is_alive()
+
+    def test_run_backup_uses_app_manager(self, app, client):
+        class _FakeMgr:
+            calls = 0
+
+            def perform_backup(self):
+                self.calls += 1
+
+        fake = app.extensions["tsm_backup_mgr"] = _FakeMgr()
+        resp = client.post("/backups/run",
+                           data={"_csrf_token": _get_csrf(client)})
+        assert resp.status_code == 302
+        assert fake.calls == 1
+
     def test_backups_shows_print_button(self, client):
         """Backups page must have the Print Inventory button."""
         resp = client.get("/backups")
@@ -583,6 +675,33 @@ class TestBackups:
         resp = client.get(f"/backups/download/{fname}")
         assert resp.status_code == 403
 
+    def test_download_wrong_prefix_blocked(self, client, tmp_path,
+                                           monkeypatch):
+        """Names the backups page does not list cannot be downloaded."""
+        import tsm.routes as routes_mod
+        monkeypatch.setattr(routes_mod, "BACKUP_DIR", str(tmp_path))
+        (tmp_path / "secrets.csv").write_bytes(b"x")
+        (tmp_path / "wheel_storage_a b.csv").write_bytes(b"x")
+        listed = client.get("/backups").data.decode()
+        assert "secrets.csv" not in listed
+        assert "wheel_storage_a b.csv" not in listed
+        assert client.get("/backups/download/secrets.csv").status_code == 403
+        assert client.get(
+            "/backups/download/wheel_storage_a b.csv").status_code == 403
+
+    def test_listed_backups_are_downloadable(self, client, tmp_path,
+                                             monkeypatch):
+        import tsm.routes as routes_mod
+        monkeypatch.setattr(routes_mod, "BACKUP_DIR", str(tmp_path))
+        for name in ("wheel_storage_20260402-120000.db",
+                     "wheel_storage_20260402-120000.csv"):
+            (tmp_path / name).write_bytes(b"x")
+        names = [f["name"] for grp in routes_mod._list_backup_groups()
+                 for f in grp["files"]]
+        assert len(names) == 2
+        for name in names:
+            assert client.get(f"/backups/download/{name}").status_code == 200
+
 
 class TestInventoryPrint:
     def test_get_empty(self, client):
@@ -5,7 +5,11 @@ Tests operate directly against a real SQLAlchemy session (in-memory SQLite)
 so they are fast and do not require the Flask request cycle.
 """
 
-from tsm.models import WheelSet
+import pytest
+from sqlalchemy import text
+
+from tsm.db import wheelset_search_filter
+from tsm.models import FTS_ENABLED, WheelSet
 
 
 # =========================================================
@@ -32,18 +36,14 @@ def _search(db, q="", sort="updated_desc", filter_pos="",
     query = db.query(WheelSet)
 
     if q:
-        like = f"%{q}%"
-        query = query.filter(
-            (WheelSet.customer_name.ilike(like)) |
-            (WheelSet.license_plate.ilike(like)) |
-            (WheelSet.car_type.ilike(like)) |
-            (WheelSet.note.ilike(like))
-        )
+        query = query.filter(wheelset_search_filter(q))
 
     if filter_pos == "container":
-        query = query.filter(WheelSet.storage_position.like("C%"))
+        query = query.filter(WheelSet.storage_position >= "C",
+                             WheelSet.storage_position < "D")
     elif filter_pos == "garage":
-        query = query.filter(WheelSet.storage_position.like("GR%"))
+        query = query.filter(WheelSet.storage_position >= "GR",
+                             WheelSet.storage_position < "GS")
 
     if filter_season:
         query = query.filter(WheelSet.season == filter_season)
@@ -145,6 +145,39 @@ class TestSearchByNote:
         assert len(results) == 1
 
 
+class TestFtsIndex:
+    """The trigram FTS5 index must follow inserts, updates and deletes."""
+
+    def _fts_rows(self, db):
+        return db.execute(text("SELECT count(*) FROM wheel_sets_fts")).scalar()
+
+    @pytest.mark.skipif(not FTS_ENABLED,
+                        reason="SQLite lacks the FTS5 trigram tokenizer")
+    def test_index_created_with_schema(self, db_session):
+        assert self._fts_rows(db_session) == 0
+        _add(db_session, "Index Kunde", "I-IK 1", "X", "C1ROL")
+        assert self._fts_rows(db_session) == 1
+
+    def test_update_reindexes(self, db_session):
+        ws = _add(db_session, "Alter Name", "A-AN 1", "X", "C1ROL")
+        ws.customer_name = "Neuer Name"
+        db_session.commit()
+        assert _search(db_session, q="Alter") == []
+        assert len(_search(db_session, q="Neuer")) == 1
+
+    def test_delete_removes_from_index(self, db_session):
+        ws = _add(db_session, "Weg Kunde", "W-WK 1", "X", "C1ROL")
+        db_session.delete(ws)
+        db_session.commit()
+        assert _search(db_session, q="Weg Kunde") == []
+
+    def test_quotes_in_query_are_literal(self, db_session):
+        _add(db_session, "Quote Kunde", "Q-QK 1", "X", "C1ROL",
+             note='Felge "Typ A"')
+        assert len(_search(db_session, q='"Typ A"')) == 1
+        assert _search(db_session, q='"Typ B') == []
+
+
 # =========================================================
 # Sort unit tests
 # =========================================================
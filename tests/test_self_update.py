@@ -2,7 +2,11 @@
 import ssl
 from unittest.mock import MagicMock, patch
 
+import urllib.error
+
+from tsm import self_update
 from tsm.self_update import (
+    _conditional_get,
     _is_frozen,
     _nocache_url,
     _ssl_context,
@@ -28,6 +32,10 @@ class TestVerTuple:
     def test_nonsense(self):
         assert _ver_tuple("abc") == (0, 0, 0)
 
+    def test_short_version_padded(self):
+        assert _ver_tuple("1.2") == (1, 2, 0)
+        assert _ver_tuple("2-rc") == (2, 0, 0)
+
     def test_comparison(self):
         assert _ver_tuple("1.3.0") > _ver_tuple("1.2.9")
         assert _ver_tuple("2.0.0") > _ver_tuple("1.99.99")
@@ -185,3 +193,33 @@ class TestGetUpdateInfo:
         ):
             info = get_update_info()
         assert info["frozen"] is _is_frozen()
+
+
+class TestConditionalGet:
+    URL = "https://example.com/config.py"
+
+    def setup_method(self):
+        self_update._etag_cache.clear()
+
+    def _resp(self, body, etag):
+        resp = MagicMock()
+        resp.read.return_value = body
+        resp.headers = {"ETag": etag} if etag else {}
+        resp.__enter__.return_value = resp
+        return resp
+
+    def test_not_modified_reuses_cached_body(self):
+        not_modified = urllib.error.HTTPError(self.URL, 304, "Not Modified", {}, None)
+        with patch("tsm.self_update.urllib.request.urlopen",
+                   side_effect=[self._resp(b"v1", '"abc"'), not_modified]) as mock_open:
+            assert _conditional_get(self.URL) == b"v1"
+            assert _conditional_get(self.URL) == b"v1"
+        second_req = mock_open.call_args_list[1][0][0]
+        assert second_req.get_header("If-none-match") == '"abc"'
+
+    def test_no_etag_sends_no_condition(self):
+        with patch("tsm.self_update.urllib.request.urlopen",
+                   side_effect=[self._resp(b"a", None), self._resp(b"b", None)]) as mock_open:
+            _conditional_get(self.URL)
+            assert _conditional_get(self.URL) == b"b"
+        assert mock_open.call_args_list[1][0][0].get_header("If-none-match") is None
@@ -312,9 +312,10 @@ class TestEditWheelsetTireDetails:
         self, client, seed_wheelset, seed_settings, db_session
     ):
         _enable_tire_details(db_session, seed_settings)
+        wid = seed_wheelset.id
         tok = _csrf(client)
         resp = client.post(
-            f"/wheelsets/{seed_wheelset.id}/edit", data={
+            f"/wheelsets/{wid}/edit", data={
                 "_csrf_token": tok,
                 "customer_name": seed_wheelset.customer_name,
                 "license_plate": seed_wheelset.license_plate,
@@ -329,7 +330,7 @@ class TestEditWheelsetTireDetails:
             }, follow_redirects=True)
         assert resp.status_code == 200
         db_session.expire_all()
-        ws = db_session.get(WheelSet, seed_wheelset.id)
+        ws = db_session.get(WheelSet, wid)
         assert ws.tire_manufacturer == "Pirelli"
         assert ws.season == "sommer"
         assert ws.rim_type == "alu"
@@ -347,8 +348,9 @@ class TestEditWheelsetTireDetails:
         )
         db_session.add(ws)
         db_session.commit()
+        wid = ws.id
         tok = _csrf(client)
-        client.post(f"/wheelsets/{ws.id}/edit", data={
+        client.post(f"/wheelsets/{wid}/edit", data={
             "_csrf_token": tok,
             "customer_name": ws.customer_name,
             "license_plate": ws.license_plate,
@@ -358,7 +360,7 @@ class TestEditWheelsetTireDetails:
             "season": "",             # cleared
         }, follow_redirects=True)
         db_session.expire_all()
-        ws = db_session.get(WheelSet, ws.id)
+        ws = db_session.get(WheelSet, wid)
         assert ws.tire_manufacturer is None
         assert ws.season is None
 
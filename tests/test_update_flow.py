@@ -195,6 +195,16 @@ class TestCheckForUpdate:
         with patch("tsm.self_update._is_frozen", return_value=False):
             assert check_for_update() is False
 
+    # ── Concurrent check → skip ───────────────────────────────────────
+    def test_concurrent_check_is_skipped(self):
+        from tsm import self_update
+        with patch("tsm.self_update._is_frozen", return_value=True), \
+             patch("tsm.self_update._fetch_latest_release") as mock_fetch:
+            with self_update._update_lock:
+                assert check_for_update() is False
+        mock_fetch.assert_not_called()
+        assert not self_update._update_lock.locked()
+
     # ── Already up to date ─────────────────────────────────────────────
     def test_already_up_to_date(self):
         from config import VERSION
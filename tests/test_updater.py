@@ -0,0 +1,300 @@
+"""
+Tests for tools/updater.py — ZIP overlay, state file and update checks.
+"""
+from __future__ import annotations
+
+import io
+import json
+import shutil
+import time
+import zipfile
+
+import pytest
+
+from tools import updater
+
+
+def _build_zip(path, files, top="Repo-master/", dir_entry=True, corrupt=None):
+    """Write a ZIP with *files* ({rel: text}) below *top*.
+
+    *corrupt* names a member whose stored bytes are altered afterwards so
+    that reading it fails the CRC-32 check.
+    """
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED) as zf:
+        if dir_entry and top:
+            zf.writestr(top, "")
+        for rel, text in files.items():
+            zf.writestr(top + rel, text)
+    if corrupt:
+        data = path.read_bytes()
+        payload = files[corrupt].encode()
+        assert data.count(payload) == 1
+        path.write_bytes(data.replace(payload, payload[:-1] + b"#"))
+    return str(path)
+
+
+def _snapshot(root):
+    return {p.relative_to(root).as_posix(): p.read_bytes()
+            for p in root.rglob("*") if p.is_file()}
+
+
+class TestOverlayFromZip:
+    def test_overlays_included_files(self, tmp_path):
+        dest = tmp_path / "app"
+        dest.mkdir()
+        (dest / "wheel_storage.db").write_bytes(b"db")
+        zpath = _build_zip(tmp_path / "u.zip", {
+            "config.py": 'VERSION = "9.9.9"\n',
+            "tsm/routes.py": "x = 1\n",
+            "static/logo.png": "png",
+        })
+        updater.overlay_from_zip(zpath, str(dest))
+        assert _snapshot(dest) == {
+            "wheel_storage.db": b"db",
+            "config.py": b'VERSION = "9.9.9"\n',
+            "tsm/routes.py": b"x = 1\n",
+        }
+
+    def test_top_dir_without_directory_entry(self, tmp_path):
+        dest = tmp_path / "app"
+        dest.mkdir()
+        zpath = _build_zip(tmp_path / "u.zip",
+                           {"config.py": "a\n", "tsm/app.py": "b\n"},
+                           dir_entry=False)
+        updater.overlay_from_zip(zpath, str(dest))
+        assert set(_snapshot(dest)) == {"config.py", "tsm/app.py"}
+
+    def test_corrupt_member_leaves_dest_unchanged(self, tmp_path):
+        dest = tmp_path / "app"
+        (dest / "tsm").mkdir(parents=True)
+        (dest / "config.py").write_text("old config\n")
+        (dest / "tsm" / "a.py").write_text("old a\n")
+        before = _snapshot(dest)
+        zpath = _build_zip(tmp_path / "u.zip", {
+            "config.py": "new config\n",
+            "tsm/a.py": "new a\n",
+            "tsm/b.py": "CORRUPT-ME\n",
+            "tsm/c.py": "new c\n",
+        }, corrupt="tsm/b.py")
+        with pytest.raises(zipfile.BadZipFile):
+            updater.overlay_from_zip(zpath, str(dest))
+        assert _snapshot(dest) == before
+        # No staging directory left behind
+        assert sorted(p.name for p in dest.iterdir()) == ["config.py", "tsm"]
+
+    def test_corrupt_member_cancels_queued_extractions(self, tmp_path,
+                                                        monkeypatch):
+        dest = tmp_path / "app"
+        dest.mkdir()
+        files = {"a_bad.py": "CORRUPT-ME\n"}
+        files.update({f"ok{i}.py": f"ok {i}\n" for i in range(5)})
+        zpath = _build_zip(tmp_path / "u.zip", files, corrupt="a_bad.py")
+        copied = []
+        real_copy = shutil.copyfileobj
+
+        def slow_copy(src, dst, length=0):
+            copied.append(1)
+            real_copy(src, dst, length)
+            time.sleep(0.1)
+
+        monkeypatch.setattr(updater.os, "cpu_count", lambda: 1)
+        monkeypatch.setattr(updater.shutil, "copyfileobj", slow_copy)
+        with pytest.raises(zipfile.BadZipFile):
+            updater.overlay_from_zip(zpath, str(dest))
+        assert len(copied) <= 2
+        assert list(dest.iterdir()) == []
+
+    def test_skips_paths_outside_dest(self, tmp_path):
+        dest = tmp_path / "app"
+        dest.mkdir()
+        zpath = _build_zip(tmp_path / "u.zip",
+                           {"../evil.py": "x\n", "ok.py": "y\n"})
+        updater.overlay_from_zip(zpath, str(dest))
+        assert set(_snapshot(dest)) == {"ok.py"}
+        assert not (tmp_path / "evil.py").exists()
+
+    def test_skips_absolute_member_names(self, tmp_path):
+        dest = tmp_path / "app"
+        dest.mkdir()
+        evil = tmp_path / "evil.py"
+        zpath = _build_zip(tmp_path / "u.zip",
+                           {str(evil): "x\n", "ok.py": "y\n"})
+        updater.overlay_from_zip(zpath, str(dest))
+        assert set(_snapshot(dest)) == {"ok.py"}
+        assert not evil.exists()
+
+    def test_skips_paths_through_symlink_out_of_dest(self, tmp_path):
+        dest = tmp_path / "app"
+        dest.mkdir()
+        outside = tmp_path / "outside"
+        outside.mkdir()
+        try:
+            (dest / "link").symlink_to(outside, target_is_directory=True)
+        except OSError:
+            pytest.skip("symlinks not available")
+        zpath = _build_zip(tmp_path / "u.zip",
+                           {"link/evil.py": "x\n", "ok.py": "y\n"})
+        updater.overlay_from_zip(zpath, str(dest))
+        assert (dest / "ok.py").exists()
+        assert not (outside / "evil.py").exists()
+
+
+class TestState:
+    def test_default_lives_in_install_dir(self):
+        assert updater.STATE_FILE.startswith(str(updater.REPO_ROOT))
+
+    def test_round_trip(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(updater, "STATE_FILE", str(tmp_path / "s.json"))
+        updater.save_state({"sha": "abc", "checked_at": 1.5})
+        assert updater.load_state() == {"sha": "abc", "checked_at": 1.5}
+
+    def test_missing_or_invalid_file_is_empty(self, tmp_path, monkeypatch):
+        path = tmp_path / "s.json"
+        monkeypatch.setattr(updater, "STATE_FILE", str(path))
+        assert updater.load_state() == {}
+        path.write_text("[1, 2]")
+        assert updater.load_state() == {}
+        path.write_text("{broken")
+        assert updater.load_state() == {}
+
+
+class TestMain:
+    @pytest.fixture
+    def env(self, tmp_path, monkeypatch):
+        """Local config.py at 1.0.0 and a tmp state file; no network."""
+        cfg = tmp_path / "config.py"
+        cfg.write_text('VERSION = "1.0.0"\n')
+        state = tmp_path / "state.json"
+        monkeypatch.setattr(updater, "LOCAL_CONFIG", str(cfg))
+        monkeypatch.setattr(updater, "STATE_FILE", str(state))
+
+        def no_network(*a, **kw):
+            raise AssertionError("unexpected network access")
+
+        monkeypatch.setattr(updater.urllib.request, "urlopen", no_network)
+        return state
+
+    def test_recent_check_short_circuits(self, env):
+        env.write_text(json.dumps({"checked_at": time.time() - 5,
+                                   "local_version": "1.0.0"}))
+        assert updater.main() == 0
+
+    def test_stale_check_goes_to_network(self, env, monkeypatch):
+        env.write_text(json.dumps({"checked_at": time.time() - 10_000,
+                                   "local_version": "1.0.0"}))
+        calls = []
+        monkeypatch.setattr(updater, "fetch_remote_version_via_raw",
+                            lambda state: calls.append(1) or None)
+        assert updater.main() == 0
+        assert calls == [1]
+
+    def test_local_version_change_bypasses_cache(self, env, monkeypatch):
+        env.write_text(json.dumps({"checked_at": time.time() - 5,
+                                   "local_version": "0.9.0"}))
+        calls = []
+        monkeypatch.setattr(updater, "fetch_remote_version_via_raw",
+                            lambda state: calls.append(1) or None)
+        updater.main()
+        assert calls == [1]
+
+    def test_unchanged_sha_skips_zip_and_records_check(self, env,
+                                                       monkeypatch):
+        env.write_text(json.dumps({"sha": "abc"}))
+        monkeypatch.setattr(updater, "fetch_remote_version_via_raw",
+                            lambda state: "1.0.0")
+        monkeypatch.setattr(updater, "fetch_latest_commit_sha", lambda: "abc")
+        assert updater.main() == 0
+        saved = json.loads(env.read_text())
+        assert saved["sha"] == "abc"
+        assert saved["local_version"] == "1.0.0"
+        assert time.time() - saved["checked_at"] < 60
+
+
+class _Resp(io.BytesIO):
+    """Minimal urlopen() response: a readable body with headers."""
+
+    def __init__(self, body, headers=None):
+        super().__init__(body)
+        self.headers = headers or {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TestRawVersion:
+    @pytest.fixture
+    def requests(self, monkeypatch):
+        """Queue of responses for urlopen(); records each request made."""
+        seen, replies = [], []
+
+        def fake_urlopen(req, timeout=None, context=None):
+            seen.append(req)
+            reply = replies.pop(0)
+            if isinstance(reply, Exception):
+                raise reply
+            return reply
+
+        monkeypatch.setattr(updater.urllib.request, "urlopen", fake_urlopen)
+        return seen, replies
+
+    @staticmethod
+    def _not_modified():
+        return updater.urllib.error.HTTPError(
+            updater.RAW_URL, 304, "Not Modified", {}, None)
+
+    def test_conditional_request_is_cache_busted(self, requests):
+        seen, replies = requests
+        replies.append(_Resp(b'VERSION = "2.0.0"\n', {"ETag": '"v2"'}))
+        replies.append(self._not_modified())
+        state = {}
+        assert updater.fetch_remote_version_via_raw(state) == "2.0.0"
+        assert state == {"raw_etag": '"v2"', "raw_version": "2.0.0"}
+        assert updater.fetch_remote_version_via_raw(state) == "2.0.0"
+        assert all("ts=" in r.full_url for r in seen)
+        assert seen[1].get_header("If-none-match") == '"v2"'
+
+    def test_body_without_version_drops_etag(self, requests):
+        seen, replies = requests
+        replies.append(_Resp(b"no version here", {"ETag": '"v3"'}))
+        state = {"raw_etag": '"v2"', "raw_version": "2.0.0"}
+        assert updater.fetch_remote_version_via_raw(state) is None
+        assert "raw_etag" not in state and "raw_version" not in state
+        # Next call is unconditional, so a 304 can't revive 2.0.0.
+        replies.append(_Resp(b'VERSION = "3.0.0"\n', {"ETag": '"v3"'}))
+        assert updater.fetch_remote_version_via_raw(state) == "3.0.0"
+        assert seen[1].get_header("If-none-match") is None
+
+
+class TestDownload:
+    def test_streams_response_to_file(self, tmp_path, monkeypatch):
+        body = b"PK" + b"x" * (3 << 20)
+        seen = {}
+
+        def fake_urlopen(req, timeout=None, context=None):
+            seen["url"] = req.full_url
+            return _Resp(body)
+
+        monkeypatch.setattr(updater.urllib.request, "urlopen", fake_urlopen)
+        target = tmp_path / "u.zip"
+        updater.download_zip_to_file(str(target))
+        assert target.read_bytes() == body
+        assert "ts=" in seen["url"]
+
+
+class TestConfigVersionFromZip:
+    def test_prefers_shortest_config_with_version(self, tmp_path):
+        zpath = _build_zip(tmp_path / "u.zip", {
+            "config.py": "# no version here\n",
+            "sub/config.py": 'VERSION = "2.1.0"\n',
+            "sub/deeper/config.py": 'VERSION = "9.9.9"\n',
+        })
+        with zipfile.ZipFile(zpath) as zf:
+            assert updater._read_config_version_from_zip(zf) == "2.1.0"
+
+    def test_no_config(self, tmp_path):
+        zpath = _build_zip(tmp_path / "u.zip", {"app.py": "x\n"})
+        with zipfile.ZipFile(zpath) as zf:
+            assert updater._read_config_version_from_zip(zf) is None
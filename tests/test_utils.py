@@ -32,6 +32,18 @@ class TestCsrf:
             with pytest.raises(Exception):
                 validate_csrf()
 
+    def test_validate_csrf_non_ascii_rejected(self, app):
+        import pytest
+        from werkzeug.exceptions import BadRequest
+        with app.test_request_context(
+                method="POST",
+                data={"_csrf_token": "töken"},
+                content_type="application/x-www-form-urlencoded"):
+            from flask import session
+            session["_csrf_token"] = "tok123"
+            with pytest.raises(BadRequest):
+                validate_csrf()
+
     def test_validate_csrf_missing(self, app):
         import pytest
         with app.test_request_context(method="POST"):
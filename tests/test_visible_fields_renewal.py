@@ -78,6 +78,18 @@ class TestVisibleFieldsModel:
         assert s.is_field_visible("season") is True
         assert s.is_field_visible("tire_manufacturer") is False
 
+    def test_visible_fields_follow_json_changes(self):
+        s = Settings(enable_tire_details=False)
+        s.visible_fields = ["season"]
+        got = s.visible_fields
+        got.append("rim_type")  # caller mutation must not leak into cache
+        assert s.visible_fields == ["season"]
+        s.visible_fields_json = json.dumps(["rim_type"])
+        assert s.is_field_visible("rim_type") is True
+        assert s.is_field_visible("season") is False
+        s.visible_fields_json = "not json"
+        assert s.visible_fields == []
+
 
 class TestTiresNeedRenewalModel:
     def test_column_exists(self):
@@ -264,15 +276,17 @@ class TestTireRenewalRoutes:
 
     def test_edit_sets_renewal_flag(self, client, seed_wheelset,
                                     seed_settings, db_session):
-        tok = _csrf(client)
         wid = seed_wheelset.id
-        resp = client.post(f"/wheelsets/{wid}/edit", data={
-            "_csrf_token": tok,
+        form = {
             "customer_name": seed_wheelset.customer_name,
             "license_plate": seed_wheelset.license_plate,
             "car_type": seed_wheelset.car_type,
             "storage_position": seed_wheelset.storage_position,
             "tires_need_renewal": "1",
+        }
+        tok = _csrf(client)
+        resp = client.post(f"/wheelsets/{wid}/edit", data={
+            "_csrf_token": tok, **form,
         }, follow_redirects=True)
         assert resp.status_code == 200
         ws = db_session.get(WheelSet, wid)
@@ -43,6 +43,7 @@ PYPROJECT_VERSION_RX = re.compile(
     r'^(version\s*=\s*")\d+\.\d+\.\d+(")',
     re.MULTILINE,
 )
+SECTION_RX = re.compile(r"^## \[([^\]]+)\][^\n]*$", re.MULTILINE)
 
 
 # ========================================================
@@ -59,11 +60,10 @@ def _stamp_changelog(new_version: str):
     text = CHANGELOG_PATH.read_text(encoding="utf-8")
 
     # Check if [Unreleased] has any content
-    section_re = re.compile(r"^## \[([^\]]+)\][^\n]*$", re.MULTILINE)
-    for m in section_re.finditer(text):
+    for m in SECTION_RX.finditer(text):
         if m.group(1).lower() == "unreleased":
             start = m.end()
-            nxt = section_re.search(text, start)
+            nxt = SECTION_RX.search(text, start)
             body = (text[start:nxt.start()] if nxt else text[start:]).strip()
             if not body:
                 print(
@@ -134,7 +134,9 @@ def main() -> int:
 
     new_version = f"{major}.{minor}.{patch}"
 
-    new_text = VERSION_RX.sub(f'{pre}{new_version}{post}', text, count=1)
+    # Splice the already-found match instead of running a second regex
+    # walk with sub(); also keeps backslashes in pre/post literal.
+    new_text = f"{text[:m.start()]}{pre}{new_version}{post}{text[m.end():]}"
     if new_text == text:
         print("ERR: substitution failed", file=sys.stderr)
         return 4
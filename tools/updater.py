@@ -15,17 +15,21 @@ Lightweight auto-updater for TireStorage Manager (Windows friendly)
 # ========================================================
 # IMPORTS
 # ========================================================
-import io
 import json
 import os
+import posixpath
 import re
+import shutil
 import ssl
 import sys
 import tempfile
+import threading
 import time
 import urllib.error
 import urllib.request
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
 # ========================================================
@@ -58,7 +62,21 @@ INCLUDE_PATTERNS = (
     ".yml", ".yaml", ".toml",
 )
 
+# Last-seen raw ETag / VERSION and branch commit SHA, so an unchanged
+# branch costs a couple of header-sized requests instead of a ZIP download.
+# Kept with the installation it describes, not in the service account's
+# home directory.
+STATE_FILE = os.environ.get(
+    "TSM_UPDATER_STATE",
+    os.path.join(REPO_ROOT, ".tsm_updater_state.json"))
+
+# A run within this many seconds of the last "no update needed" result
+# returns immediately without any network request
+RECHECK_SECONDS = int(os.environ.get("TSM_UPDATER_RECHECK", "600"))
+
 VERSION_RX = re.compile(r'^\s*VERSION\s*=\s*"([^"]+)"', re.MULTILINE)
+# Same pattern for file/archive contents, matched without decoding them
+VERSION_RX_BYTES = re.compile(rb'^\s*VERSION\s*=\s*"([^"]+)"', re.MULTILINE)
 
 
 # ========================================================
@@ -68,12 +86,16 @@ def log(msg: str):
     print(f"[updater] {msg}")
 
 
+@lru_cache(maxsize=1)
 def _ssl_context() -> ssl.SSLContext:
     """Return an SSL context that trusts the OS certificate store.
 
     On Windows this includes enterprise/corporate root CAs deployed via
     Group Policy, which fixes SSL_CERTIFICATE_VERIFY_FAILED errors in
     managed networks without disabling certificate verification.
+
+    Built once per run: loading the certificate store is the expensive
+    part, and a shared context also lets TLS sessions be resumed.
     """
     ctx = ssl.create_default_context()
     if sys.platform == "win32":
@@ -96,24 +118,44 @@ def _make_request(url: str,
     return urllib.request.Request(url, headers=base_headers)
 
 
+def load_state() -> dict:
+    try:
+        with open(STATE_FILE, encoding="utf-8") as f:
+            state = json.load(f)
+        return state if isinstance(state, dict) else {}
+    except Exception:
+        return {}
+
+
+def save_state(state: dict) -> None:
+    try:
+        with open(STATE_FILE, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+    except Exception as e:
+        log(f"WARN: could not save updater state: {e}")
+
+
 def read_local_version(path: str) -> str | None:
     try:
-        with open(path, encoding="utf-8", errors="ignore") as f:
-            m = VERSION_RX.search(f.read())
-            return m.group(1) if m else None
+        with open(path, "rb") as f:
+            m = VERSION_RX_BYTES.search(f.read())
+            return m.group(1).decode("utf-8", errors="ignore") if m else None
     except Exception:
         return None
 
 
+def _nocache_url(url: str) -> str:
+    """Append a ``ts=`` cache-buster so CDNs don't serve a stale copy."""
+    sep = "&" if "?" in url else "?"
+    return f"{url}{sep}ts={int(time.time())}"
+
+
 def fetch_text_nocache(url: str, timeout=15) -> str | None:
     """
     Fetch text from URL with cache-buster query and 'no-cache' headers to
     avoid CDN caching.
     """
-    ts = int(time.time())
-    sep = "&" if "?" in url else "?"
-    nocache_url = f"{url}{sep}ts={ts}"
-    req = _make_request(nocache_url)
+    req = _make_request(_nocache_url(url))
     try:
         with urllib.request.urlopen(req, timeout=timeout, context=_ssl_context()) as resp:
             return resp.read().decode("utf-8", errors="ignore")
@@ -122,24 +164,70 @@ def fetch_text_nocache(url: str, timeout=15) -> str | None:
         return None
 
 
-def fetch_remote_version_via_raw() -> str | None:
-    data = fetch_text_nocache(RAW_URL)
+def fetch_remote_version_via_raw(state: dict | None = None) -> str | None:
+    """
+    Read VERSION from the raw config.py.
+
+    With a *state* dict the request is conditional on the last-seen ETag;
+    a 304 answer reuses the cached version without a body transfer.
+    """
+    if state is None:
+        data = fetch_text_nocache(RAW_URL)
+    else:
+        etag = state.get("raw_etag")
+        cached = state.get("raw_version")
+        headers = {"If-None-Match": etag} if etag and cached else None
+        req = _make_request(_nocache_url(RAW_URL), headers=headers)
+        try:
+            with urllib.request.urlopen(req, timeout=15, context=_ssl_context()) as resp:
+                data = resp.read().decode("utf-8", errors="ignore")
+                etag = resp.headers.get("ETag")
+        except urllib.error.HTTPError as e:
+            if e.code == 304 and cached:
+                return cached
+            log(f"WARN: raw fetch failed: {e}")
+            return None
+        except Exception as e:
+            log(f"WARN: raw fetch failed: {e}")
+            return None
     if not data:
         return None
     m = VERSION_RX.search(data)
+    if state is not None:
+        # The ETag is only useful paired with the version it vouches for;
+        # never let a 304 resurrect a version from an older body.
+        if m and etag:
+            state["raw_etag"] = etag
+            state["raw_version"] = m.group(1)
+        else:
+            state.pop("raw_etag", None)
+            state.pop("raw_version", None)
     if m:
         return m.group(1)
     log("WARN: VERSION not found in raw; preview:\n" + data[:200])
     return None
 
 
-def fetch_zip_bytes() -> bytes:
-    ts = int(time.time())
-    sep = "&" if "?" in ZIP_URL else "?"
-    url = f"{ZIP_URL}{sep}ts={ts}"
-    req = _make_request(url, headers={"Accept": "application/zip"})
-    with urllib.request.urlopen(req, timeout=60, context=_ssl_context()) as resp:
-        return resp.read()
+def download_zip_to_file(path: str) -> None:
+    """Stream the branch ZIP to *path* without holding it in memory."""
+    req = _make_request(_nocache_url(ZIP_URL),
+                        headers={"Accept": "application/zip"})
+    with urllib.request.urlopen(req, timeout=60, context=_ssl_context()) as resp, \
+            open(path, "wb") as f:
+        shutil.copyfileobj(resp, f, length=1 << 20)
+
+
+def _temp_zip_path() -> str:
+    fd, path = tempfile.mkstemp(prefix="tsm_update_", suffix=".zip")
+    os.close(fd)
+    return path
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
 
 
 def _read_config_version_from_zip(zf: zipfile.ZipFile) -> str | None:
@@ -147,18 +235,18 @@ def _read_config_version_from_zip(zf: zipfile.ZipFile) -> str | None:
     Try to read VERSION from config.py inside the archive.
     """
     # Find a path ending with /config.py or config.py at root
-    candidates = [n for n in zf.namelist() if n.endswith("/config.py") or
-                  n.endswith("config.py")]
+    candidates = [info for info in zf.infolist()
+                  if info.filename.endswith("/config.py")
+                  or info.filename == "config.py"]
     # Prefer the shortest candidate (likely root/app root)
-    candidates.sort(key=len)
-    for name in candidates:
+    for info in sorted(candidates, key=lambda i: len(i.filename)):
         try:
-            data = zf.read(name).decode("utf-8", errors="ignore")
-            m = VERSION_RX.search(data)
-            if m:
-                return m.group(1)
+            data = zf.read(info)
         except Exception:
             continue
+        m = VERSION_RX_BYTES.search(data)
+        if m:
+            return m.group(1).decode("utf-8", errors="ignore")
     return None
 
 
@@ -178,17 +266,16 @@ def _fallback_scan_version_in_zip(zf: zipfile.ZipFile) -> str | None:
             info = zf.getinfo(name)
             if info.file_size > 256 * 1024:
                 continue
-            data = zf.read(name).decode("utf-8", errors="ignore")
-            m = VERSION_RX.search(data)
+            m = VERSION_RX_BYTES.search(zf.read(name))
             if m:
-                return m.group(1)
+                return m.group(1).decode("utf-8", errors="ignore")
         except Exception:
             continue
     return None
 
 
-def extract_remote_version_from_zip(zip_bytes: bytes) -> str | None:
-    with zipfile.ZipFile(io.BytesIO(zip_bytes)) as zf:
+def extract_remote_version_from_zip(zip_path: str) -> str | None:
+    with zipfile.ZipFile(zip_path) as zf:
         v = _read_config_version_from_zip(zf)
         if v:
             return v
@@ -214,14 +301,9 @@ def fetch_latest_commit_sha() -> str | None:
 
 
 def semantic_tuple(v: str) -> tuple:
-    parts = re.split(r"[.-]", v.strip())
-    out = []
-    for p in parts:
-        try:
-            out.append(int(p))
-        except Exception:
-            out.append(0)
-    return tuple(out)
+    # Split on "." and "-"; non-numeric parts (e.g. "rc1") count as 0
+    return tuple(int(p) if p.isdecimal() else 0
+                 for p in v.strip().replace("-", ".").split("."))
 
 
 def should_update(local: str | None, remote: str | None) -> bool:
@@ -235,88 +317,176 @@ def should_update(local: str | None, remote: str | None) -> bool:
         return remote != local
 
 
-def overlay_from_zip(zip_bytes: bytes, dest_root: str) -> None:
+def overlay_from_zip(zip_path: str, dest_root: str) -> None:
     """
     Overlay selected files from archive to dest_root.
 
     Preserves DB/backups/.venv by only writing files matching INCLUDE_PATTERNS.
+    Every member is first extracted (and so CRC-checked) into a staging
+    directory inside dest_root; dest_root is only touched once all of them
+    succeeded.  Raises zipfile.BadZipFile if the archive or a member is
+    corrupt, leaving dest_root unchanged.
     """
-    with zipfile.ZipFile(io.BytesIO(zip_bytes)) as zf:
-        # Detect top-level directory (e.g., "Repo-branch/")
-        top = None
-        for n in zf.namelist():
-            if n.endswith("/") and n.count("/") == 1:
-                top = n
-                break
-        if not top:
-            top = os.path.commonprefix(zf.namelist())
-
-        for name in zf.namelist():
+    with zipfile.ZipFile(zip_path) as zf:
+        names = zf.namelist()
+        # Detect top-level directory (e.g., "Repo-branch/"); without an
+        # explicit directory entry, use the deepest directory shared by all
+        # members (ZIP names always use "/", hence posixpath).
+        top = next((n for n in names
+                    if n.endswith("/") and n.count("/") == 1), None)
+        if top is None:
+            common = (posixpath.commonpath([posixpath.dirname(n) for n in names])
+                      if names else "")
+            top = common + "/" if common else ""
+        top_len = len(top)
+        root = os.path.realpath(dest_root)
+
+        members = []
+        for name in names:
             if not name.startswith(top):
                 continue
-            rel = name[len(top):]
+            rel = name[top_len:]
             if not rel or rel.endswith("/"):
                 continue
-            if not any(rel.endswith(ext) for ext in INCLUDE_PATTERNS):
+            if not rel.endswith(INCLUDE_PATTERNS):
+                continue
+            # Never write outside dest_root ("zip slip"): check the resolved
+            # target, which also catches absolute and drive-letter names
+            # ("C:/x.py") and symlinks inside dest_root.
+            target = os.path.realpath(os.path.join(root, rel))
+            try:
+                if os.path.commonpath([root, target]) != root:
+                    continue
+            except ValueError:  # different drives on Windows
                 continue
+            members.append((name, rel))
 
-            # Normalize destination path
+    # Staging lives inside dest_root so the final moves are same-volume
+    # renames.
+    staging = tempfile.mkdtemp(prefix=".tsm_update_", dir=dest_root)
+    try:
+        _extract_members(zip_path, members, staging)
+        # Only renames from here on; a failure now (e.g. a file locked on
+        # Windows) is the one case that can leave a partial update.
+        for _, rel in members:
             dest_path = os.path.join(dest_root, rel)
             os.makedirs(os.path.dirname(dest_path), exist_ok=True)
-
-            # Write file
-            src_data = zf.read(name)
-            with open(dest_path, "wb") as f:
-                f.write(src_data)
+            os.replace(os.path.join(staging, rel), dest_path)
             log(f"updated: {rel}")
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def _extract_members(zip_path: str, members: list, staging: str) -> None:
+    """Extract *members* ((name, rel) pairs) below *staging*.
+
+    Reading a member to the end verifies its CRC-32, so a corrupt
+    archive raises here, before anything outside *staging* is written.
+    """
+    # zlib and file writes release the GIL, so members are inflated and
+    # written in parallel.  ZipFile objects are not safe to share between
+    # threads; each worker opens its own handle on the archive file.
+    local = threading.local()
+    handles = []
+    handles_lock = threading.Lock()
+
+    def _write_one(name: str, rel: str) -> None:
+        zf = getattr(local, "zf", None)
+        if zf is None:
+            zf = local.zf = zipfile.ZipFile(zip_path)
+            with handles_lock:
+                handles.append(zf)
+        path = os.path.join(staging, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with zf.open(name) as src, open(path, "wb") as dst:
+            shutil.copyfileobj(src, dst, length=1 << 20)
+
+    try:
+        with ThreadPoolExecutor(max_workers=os.cpu_count() or 4) as pool:
+            futures = [pool.submit(_write_one, name, rel)
+                       for name, rel in members]
+            try:
+                for fut in futures:
+                    fut.result()
+            except BaseException:
+                # Stop at the first bad member: drop queued extractions and
+                # only wait for the ones already running.
+                pool.shutdown(wait=True, cancel_futures=True)
+                raise
+    finally:
+        for zf in handles:
+            zf.close()
 
 
 def main() -> int:
     local_v = read_local_version(LOCAL_CONFIG)
     log(f"Local VERSION: {local_v or 'n/a'}")
 
-    remote_v = fetch_remote_version_via_raw()
+    state = load_state()
+    checked_at = state.get("checked_at")
+    if (isinstance(checked_at, (int, float))
+            and 0 <= time.time() - checked_at < RECHECK_SECONDS
+            and state.get("local_version") == local_v):
+        log("OK: recent check cached; no update needed.")
+        return 0
+
+    remote_v = fetch_remote_version_via_raw(state)
     log(f"Remote VERSION (raw): {remote_v or 'n/a'}")
 
-    # If raw says "same":
-    # double-check by reading version inside ZIP to defeat caching
+    # If raw says "same": double-check by reading version inside ZIP to
+    # defeat caching -- but only if the branch moved since the last check.
+    sha = None
     if local_v and remote_v and local_v == remote_v:
-        try:
-            zip_bytes = fetch_zip_bytes()
-            remote_v_zip = extract_remote_version_from_zip(zip_bytes)
-            if remote_v_zip and remote_v_zip != remote_v:
-                log(f"Remote VERSION (zip): {remote_v_zip}")
-                remote_v = remote_v_zip
-        except Exception as e:
-            log(f"WARN: ZIP cross-check failed: {e}")
-
-    if not should_update(local_v, remote_v):
-        # Optional last resort:
-        # if versions look equal but latest commit changed, just log it
         sha = fetch_latest_commit_sha()
         if sha:
             log(f"Latest branch commit SHA: {sha}")
+        if sha and sha == state.get("sha"):
+            log("Branch unchanged since last check; skipping ZIP cross-check.")
+        else:
+            zip_path = _temp_zip_path()
+            try:
+                download_zip_to_file(zip_path)
+                remote_v_zip = extract_remote_version_from_zip(zip_path)
+                if remote_v_zip and remote_v_zip != remote_v:
+                    log(f"Remote VERSION (zip): {remote_v_zip}")
+                    remote_v = remote_v_zip
+            except Exception as e:
+                log(f"WARN: ZIP cross-check failed: {e}")
+                sha = None  # retry the cross-check next time
+            finally:
+                _remove_quietly(zip_path)
+
+    if not should_update(local_v, remote_v):
+        if sha:
+            state["sha"] = sha
+        if remote_v:
+            state["checked_at"] = time.time()
+            state["local_version"] = local_v
+        save_state(state)
         log("OK: no update needed.")
         return 0
 
     log(f"INFO: updating {local_v or 'n/a'} -> {remote_v} ...")
+    zip_path = _temp_zip_path()
     try:
-        zip_bytes = fetch_zip_bytes()
-    except urllib.error.URLError as e:
-        log(f"ERROR: download failed: {e}")
-        return 2
-
-    # Extract into temp to validate ZIP; then overlay
-    with tempfile.TemporaryDirectory() as tmp:
         try:
-            with zipfile.ZipFile(io.BytesIO(zip_bytes)) as zf:
-                zf.extractall(tmp)
+            download_zip_to_file(zip_path)
+        except urllib.error.URLError as e:
+            log(f"ERROR: download failed: {e}")
+            return 2
+
+        # Overlay selected files into this project directory.  Members are
+        # extracted and CRC-checked in a staging directory first, so a
+        # corrupt archive leaves the installation untouched.
+        try:
+            overlay_from_zip(zip_path, dest_root=REPO_ROOT)
         except zipfile.BadZipFile:
             log("ERROR: invalid ZIP from GitHub.")
             return 3
-        # Overlay selected files into this project directory
-        overlay_from_zip(zip_bytes, dest_root=REPO_ROOT)
+    finally:
+        _remove_quietly(zip_path)
 
+    save_state(state)
     log(f"OK: updated to {remote_v}.")
     return 10
 
@@ -17,7 +17,7 @@ from flask import Flask, g
 # Local Imports
 # --------------------------------------------------------
 from config import APP_NAME, IS_PRERELEASE, SECRET_KEY, VERSION
-from tsm.i18n import SUPPORTED_LOCALES, get_locale, gettext
+from tsm.i18n import get_locale, gettext
 from tsm.utils import get_csrf_token
 
 # --------------------------------------------------------
@@ -40,20 +40,20 @@ def create_app():
     app.secret_key = SECRET_KEY
 
     # ── Locale: set g._tsm_locale before every request ──────────
+    # The language is cached in app.config["_TSM_LOCALE"] by
+    # routes._refresh_settings_cache() at startup and on settings save,
+    # so this needs no DB query.
     @app.before_request
     def _set_locale():
+        g._tsm_locale = app.config.get("_TSM_LOCALE", "de")
+
+    # ── DB session: one scoped session per request ──────────────
+    # Routes and helpers all get the same session from SessionLocal();
+    # it is released once, here, whenever an app context ends.
+    @app.teardown_appcontext
+    def _remove_session(exc=None):
         from tsm.db import SessionLocal
-        from tsm.models import Settings
-        try:
-            db = SessionLocal()
-            s = db.query(Settings).first()
-            locale = (s.language if s and s.language in SUPPORTED_LOCALES
-                      else "de")
-        except Exception:
-            locale = "de"
-        finally:
-            SessionLocal.remove()
-        g._tsm_locale = locale
+        SessionLocal.remove()
 
     # Jinja globals
     app.jinja_env.globals["csrf_token"] = get_csrf_token
@@ -69,3 +69,16 @@ def create_app():
     register_routes(app)
 
     return app
+
+
+def warm_templates(app) -> int:
+    """Compile every HTML template once so no request pays for parsing.
+
+    Jinja keeps compiled templates in the environment's cache, so later
+    render_template() calls reuse them. Returns the number compiled.
+    """
+    env = app.jinja_env
+    names = env.list_templates(extensions=("html",))
+    for name in names:
+        env.get_template(name)
+    return len(names)
@@ -13,12 +13,15 @@ import logging
 import os
 import sqlite3
 import threading
+import time
 from collections import defaultdict
 from datetime import UTC, datetime, timedelta
 
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
 from openpyxl.utils import get_column_letter
+from sqlalchemy import select
 
 # --------------------------------------------------------
 # Local Imports
@@ -28,6 +31,57 @@ from tsm.db import SessionLocal
 from tsm.models import AuditLog, Settings, WheelSet
 from tsm.positions import RE_CONTAINER, RE_GARAGE, position_sort_key
 
+# ========================================================
+# GLOBALS
+# ========================================================
+# Online backup is copied in steps of this many pages, pausing
+# _BACKUP_STEP_SLEEP seconds between steps, so each step does a bounded
+# amount of work.  Under WAL the backup never blocked writers anyway.
+# A write through another connection restarts the copy, so under steady
+# saves a large database takes longer to back up, not less.
+_BACKUP_STEP_PAGES = 256
+_BACKUP_STEP_SLEEP = 0.05
+
+# The scheduler sleeps until the next backup is due, but re-reads the
+# interval from Settings at least this often (seconds) in case it was
+# changed without notify_settings_changed().
+_SETTINGS_TTL = 300
+
+# Retry delay (seconds) after an error in the scheduler loop
+_POLL_SECONDS = 30
+
+# Rows fetched per round trip when streaming snapshot exports
+_EXPORT_BATCH_SIZE = 500
+
+# Bumped whenever this module finishes writing or pruning backup files.
+# Cached directory listings (routes.backups) compare it to notice changes
+# that leave the directory mtime alone, e.g. a file that grew while it
+# was being written.
+_backup_generation = 0
+
+
+def backup_generation() -> int:
+    """Return the current backup-file generation counter."""
+    return _backup_generation
+
+
+def _bump_backup_generation() -> None:
+    global _backup_generation
+    _backup_generation += 1
+
+
+# Schedulers whose run() loop is active, woken by notify_settings_changed()
+_running: set = set()
+_running_lock = threading.Lock()
+
+
+def notify_settings_changed() -> None:
+    """Tell running backup schedulers that the backup settings changed."""
+    with _running_lock:
+        managers = list(_running)
+    for mgr in managers:
+        mgr.notify_settings_changed()
+
 
 # ========================================================
 # CLASSES
@@ -42,38 +96,75 @@ class BackupManager(threading.Thread):
         self.engine = engine
         self.backup_dir = backup_dir
         self._stop_event = threading.Event()
+        self._wake = threading.Event()
         self._last_run = None
+        self._interval = None
+        self._interval_read_at = 0.0
 
     def stop(self):
         self._stop_event.set()
+        self._wake.set()
+
+    def notify_settings_changed(self):
+        """Drop the cached interval and recompute the next due time now."""
+        self._interval = None
+        self._wake.set()
+
+    def _backup_interval(self) -> int:
+        """Return the backup interval in minutes.
+
+        The value is cached and re-read from Settings only when it is
+        older than ``_SETTINGS_TTL`` seconds or after a backup ran.
+        """
+        now = time.monotonic()
+        if (self._interval is None
+                or now - self._interval_read_at >= _SETTINGS_TTL):
+            db = SessionLocal()
+            try:
+                settings = db.query(Settings).first()
+                if settings is None:
+                    settings = Settings(backup_interval_minutes=60,
+                                        backup_copies=10)
+                    db.add(settings)
+                    db.commit()
+                self._interval = max(1, int(settings.backup_interval_minutes))
+            finally:
+                SessionLocal.remove()
+            self._interval_read_at = now
+        return self._interval
 
     def run(self):
+        with _running_lock:
+            _running.add(self)
+        try:
+            self._run_loop()
+        finally:
+            with _running_lock:
+                _running.discard(self)
+
+    def _run_loop(self):
         while not self._stop_event.is_set():
             try:
-                db = SessionLocal()
-                try:
-                    settings = db.query(Settings).first()
-                    if settings is None:
-                        settings = Settings(backup_interval_minutes=60,
-                                            backup_copies=10)
-                        db.add(settings)
-                        db.commit()
-                    interval = max(1, int(settings.backup_interval_minutes))
-                    due = False
-                    if self._last_run is None:
-                        self._last_run = datetime.now(UTC)
-                    elif ((datetime.now(UTC) - self._last_run)
-                          >= timedelta(minutes=interval)):
-                        due = True
-                finally:
-                    SessionLocal.remove()
-                if due:
+                interval = self._backup_interval()
+                now = datetime.now(UTC)
+                if self._last_run is None:
+                    self._last_run = now
+                due_in = (self._last_run + timedelta(minutes=interval)
+                          - now).total_seconds()
+                if due_in <= 0:
                     self.perform_backup()
                     self._last_run = datetime.now(UTC)
+                    self._interval = None
+                    continue
+                wait = min(due_in, _SETTINGS_TTL)
             except Exception:
                 self._log.warning("BackupManager loop error",
                                   exc_info=True)
-            self._stop_event.wait(30)
+                wait = _POLL_SECONDS
+            # Sleeps until the next backup is due; stop() and
+            # notify_settings_changed() end the wait early.
+            self._wake.wait(max(0.1, wait))
+            self._wake.clear()
 
     def perform_backup(self):
         """Perform a backup of the database and export a CSV and XLSX snapshot. Old backups
@@ -87,114 +178,137 @@ class BackupManager(threading.Thread):
             dest = sqlite3.connect(bfile)
             try:
                 with dest:
-                    src.backup(dest)
+                    src.backup(dest, pages=_BACKUP_STEP_PAGES,
+                               sleep=_BACKUP_STEP_SLEEP)
             finally:
                 dest.close()
         finally:
             raw.close()
 
-        csvfile = os.path.join(self.backup_dir, f"wheel_storage_{ts}.csv")
-        export_csv_snapshot(csvfile)
-
-        xlsxfile = os.path.join(self.backup_dir, f"wheel_storage_{ts}.xlsx")
-        export_xlsx_snapshot(xlsxfile)
-
+        # One session for both snapshots, the pruning and all three audit
+        # entries, committed once at the end.
         db = SessionLocal()
         try:
-            db.add(AuditLog(action="backup",
-                            details=f"Backup erstellt: {os.path.basename(bfile)}"))
-            db.commit()
+            csvfile = os.path.join(self.backup_dir, f"wheel_storage_{ts}.csv")
+            export_csv_snapshot(csvfile, db=db)
+
+            xlsxfile = os.path.join(self.backup_dir, f"wheel_storage_{ts}.xlsx")
+            export_xlsx_snapshot(xlsxfile, db=db)
 
             settings = db.query(Settings).first()
             keep = max(1, settings.backup_copies if settings else 10)
 
-            backups_db = sorted(
-                [f for f in os.listdir(self.backup_dir)
-                 if f.startswith("wheel_storage_") and f.endswith(".db")]
-            )
-            if len(backups_db) > keep:
-                for f in backups_db[0:len(backups_db)-keep]:
-                    try:
-                        os.remove(os.path.join(self.backup_dir, f))
-                    except Exception:
-                        pass
-
-            backups_csv = sorted(
-                [f for f in os.listdir(self.backup_dir)
-                 if f.startswith("wheel_storage_") and f.endswith(".csv")]
-            )
-            if len(backups_csv) > keep:
-                for f in backups_csv[0:len(backups_csv)-keep]:
-                    try:
-                        os.remove(os.path.join(self.backup_dir, f))
-                    except Exception:
-                        pass
-
-            backups_xlsx = sorted(
-                [f for f in os.listdir(self.backup_dir)
-                 if f.startswith("wheel_storage_") and f.endswith(".xlsx")]
-            )
-            if len(backups_xlsx) > keep:
-                for f in backups_xlsx[0:len(backups_xlsx)-keep]:
-                    try:
-                        os.remove(os.path.join(self.backup_dir, f))
-                    except Exception:
-                        pass
+            # One directory pass, partitioned by backup type.
+            by_type: dict[str, list[os.DirEntry]] = {
+                ".db": [], ".csv": [], ".xlsx": []}
+            with os.scandir(self.backup_dir) as it:
+                for entry in it:
+                    name = entry.name
+                    if name.startswith("wheel_storage_"):
+                        bucket = by_type.get(os.path.splitext(name)[1])
+                        if bucket is not None:
+                            bucket.append(entry)
+            for entries in by_type.values():
+                if len(entries) > keep:
+                    entries.sort(key=lambda e: e.name)
+                    for entry in entries[0:len(entries)-keep]:
+                        try:
+                            os.remove(entry.path)
+                        except Exception:
+                            pass
+
+            db.add(AuditLog(action="backup",
+                            details=f"Backup erstellt: {os.path.basename(bfile)}"))
+            db.commit()
         finally:
             SessionLocal.remove()
+            _bump_backup_generation()
 
 
 # ========================================================
 # FUNCTIONS
 # ========================================================
-def export_csv_snapshot(target_path: str | None = None) -> str:
-    db = SessionLocal()
+# CSV snapshot columns, in file order; the header uses the column names
+_CSV_COLUMNS = (
+    WheelSet.customer_name, WheelSet.license_plate, WheelSet.car_type,
+    WheelSet.note, WheelSet.storage_position,
+    WheelSet.tire_manufacturer, WheelSet.tire_size, WheelSet.tire_age,
+    WheelSet.season, WheelSet.rim_type, WheelSet.exchange_note,
+    WheelSet.tires_need_renewal,
+    WheelSet.created_at, WheelSet.updated_at,
+)
+
+
+def export_csv_snapshot(target_path: str | None = None, db=None) -> str:
+    """Write all wheel sets to a semicolon-separated CSV file.
+
+    With *db* given, the audit entry is only added to that session and
+    the caller commits; otherwise a session is opened and committed here.
+    """
+    own_session = db is None
+    if own_session:
+        db = SessionLocal()
     try:
-        rows = db.query(WheelSet).order_by(
-            WheelSet.storage_position.asc()).all()
         if target_path is None:
             ts = datetime.now(UTC).strftime("%Y%m%d-%H%M%S")
             target_path = os.path.join(BACKUP_DIR, f"wheel_storage_{ts}.csv")
         with open(target_path, "w", newline="", encoding="utf-8-sig") as f:
             w = csv.writer(f, delimiter=';')
-            w.writerow(["customer_name", "license_plate", "car_type", "note",
-                        "storage_position",
-                        "tire_manufacturer", "tire_size", "tire_age",
-                        "season", "rim_type", "exchange_note",
-                        "tires_need_renewal",
-                        "created_at", "updated_at"])
-            for r in rows:
-                w.writerow([
-                    r.customer_name,
-                    r.license_plate,
-                    r.car_type,
-                    r.note or "",
-                    r.storage_position,
-                    r.tire_manufacturer or "",
-                    r.tire_size or "",
-                    r.tire_age or "",
-                    r.season or "",
-                    r.rim_type or "",
-                    r.exchange_note or "",
-                    "1" if r.tires_need_renewal else "0",
-                    (r.created_at.isoformat() if r.created_at else ""),
-                    (r.updated_at.isoformat() if r.updated_at else ""),
-                ])
+            w.writerow([c.key for c in _CSV_COLUMNS])
+            # Stream plain rows in batches straight into the file instead
+            # of materialising the whole table as ORM objects first.
+            rows = db.execute(
+                select(*_CSV_COLUMNS)
+                .order_by(WheelSet.storage_position.asc())
+                .execution_options(yield_per=_EXPORT_BATCH_SIZE)
+            )
+            w.writerows(
+                (r.customer_name,
+                 r.license_plate,
+                 r.car_type,
+                 r.note or "",
+                 r.storage_position,
+                 r.tire_manufacturer or "",
+                 r.tire_size or "",
+                 r.tire_age or "",
+                 r.season or "",
+                 r.rim_type or "",
+                 r.exchange_note or "",
+                 "1" if r.tires_need_renewal else "0",
+                 (r.created_at.isoformat() if r.created_at else ""),
+                 (r.updated_at.isoformat() if r.updated_at else ""))
+                for r in rows
+            )
+        _bump_backup_generation()
         filename = os.path.basename(target_path)
         db.add(AuditLog(action="backup_csv",
                         details=f"CSV exportiert: {filename}"))
-        db.commit()
+        if own_session:
+            db.commit()
         return target_path
     finally:
-        SessionLocal.remove()
+        if own_session:
+            SessionLocal.remove()
+
 
+def export_xlsx_snapshot(target_path: str | None = None, db=None) -> str:
+    """Export a print-ready XLSX inventory grouped by container and garage.
 
-def export_xlsx_snapshot(target_path: str | None = None) -> str:
-    """Export a print-ready XLSX inventory grouped by container and garage."""
-    db = SessionLocal()
+    *db* works as for :func:`export_csv_snapshot`.
+    """
+    own_session = db is None
+    if own_session:
+        db = SessionLocal()
     try:
-        rows = db.query(WheelSet).all()
-        rows = sorted(rows, key=lambda r: position_sort_key(r.storage_position))
+        # Only the printed columns, as plain rows (no ORM instances); the
+        # position order isn't lexicographic, so sorting stays in Python.
+        rows = db.execute(select(
+            WheelSet.storage_position, WheelSet.customer_name,
+            WheelSet.license_plate, WheelSet.car_type, WheelSet.note,
+            WheelSet.tire_manufacturer, WheelSet.tire_size,
+            WheelSet.tire_age, WheelSet.season, WheelSet.tires_need_renewal,
+        )).all()
+        rows.sort(key=lambda r: position_sort_key(r.storage_position))
 
         if target_path is None:
             ts = datetime.now(UTC).strftime("%Y%m%d-%H%M%S")
@@ -229,11 +343,20 @@ def export_xlsx_snapshot(target_path: str | None = None) -> str:
         ALT_FILL = PatternFill("solid", fgColor="F2F2F2")
         THIN = Side(style="thin")
         FULL_BORDER = Border(left=THIN, right=THIN, top=THIN, bottom=THIN)
+        SECTION_FONT = Font(bold=True, size=11)
+        SECTION_ALIGN = Alignment(horizontal="left", vertical="center",
+                                  indent=1)
+        HEADER_FONT = Font(bold=True, color="FFFFFF")
+        CENTER_ALIGN = Alignment(horizontal="center", vertical="center")
+        DATA_ALIGN = Alignment(vertical="center")
 
         # ── workbook ──────────────────────────────────────────────────────
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Bestandsübersicht"
+        # write_only streams rows straight to the XML writer instead of
+        # keeping every cell object in memory. Column widths, print
+        # settings and row heights must therefore be set *before* the
+        # affected rows are appended.
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet(title="Bestandsübersicht")
 
         col_widths = [5, 14, 24, 14, 22, 24, 14, 12, 10, 10, 10, 5]
         col_headers = ["Nr.", "Position", "Kunde", "Kennzeichen",
@@ -246,26 +369,50 @@ def export_xlsx_snapshot(target_path: str | None = None) -> str:
         for i, w in enumerate(col_widths, 1):
             ws.column_dimensions[get_column_letter(i)].width = w
 
+        # Print settings: landscape, fit to one page wide
+        ws.page_setup.orientation = "landscape"
+        ws.page_setup.fitToWidth = 1
+        ws.page_setup.fitToHeight = 0
+        ws.page_setup.fitToPage = True
+        ws.page_margins.left = 0.5
+        ws.page_margins.right = 0.5
+        ws.page_margins.top = 0.75
+        ws.page_margins.bottom = 0.75
+
+        def _cell(value, font=None, fill=None, border=None, alignment=None):
+            c = WriteOnlyCell(ws, value=value)
+            if font is not None:
+                c.font = font
+            if fill is not None:
+                c.fill = fill
+            if border is not None:
+                c.border = border
+            if alignment is not None:
+                c.alignment = alignment
+            return c
+
         # Title
-        ws.merge_cells(f"A1:{last_col}1")
-        c = ws["A1"]
-        c.value = "Reifenlager \u2013 Bestandsübersicht"
-        c.font = Font(bold=True, size=14)
-        c.alignment = Alignment(horizontal="center", vertical="center")
+        ws.merged_cells.add(f"A1:{last_col}1")
         ws.row_dimensions[1].height = 22
+        ws.append([_cell("Reifenlager \u2013 Bestandsübersicht",
+                         font=Font(bold=True, size=14),
+                         alignment=Alignment(horizontal="center",
+                                             vertical="center"))])
 
         # Sub-title with date and total count
-        ws.merge_cells(f"A2:{last_col}2")
-        c = ws["A2"]
-        c.value = (
+        ws.merged_cells.add(f"A2:{last_col}2")
+        ws.append([_cell(
             f"Erstellt: "
             f"{datetime.now(UTC).strftime('%d.%m.%Y %H:%M')} UTC"
-            f"  \u2013  Gesamt: {len(rows)} Rads\u00e4tze"
-        )
-        c.font = Font(italic=True, size=10)
-        c.alignment = Alignment(horizontal="center")
+            f"  \u2013  Gesamt: {len(rows)} Rads\u00e4tze",
+            font=Font(italic=True, size=10),
+            alignment=Alignment(horizontal="center"))])
 
-        current_row = 3  # blank separator after header rows
+        ws.append([])  # blank separator after header rows
+        current_row = 3
+
+        # Check column is centred, everything else only vertically
+        data_aligns = [DATA_ALIGN] * (num_cols - 1) + [CENTER_ALIGN]
 
         for (gtype, _gid, glabel), group_rows in sorted_groups:
             group_fill = (
@@ -274,28 +421,27 @@ def export_xlsx_snapshot(target_path: str | None = None) -> str:
                 else OTHER_FILL
             )
 
-            # Blank row before each section (skip before first if immediately after header)
-            current_row += 1
-
             # Section header
-            ws.merge_cells(f"A{current_row}:{last_col}{current_row}")
-            c = ws.cell(row=current_row, column=1,
-                        value=f"  {glabel}  ({len(group_rows)} Rads\u00e4tze)")
-            c.font = Font(bold=True, size=11)
-            c.fill = group_fill
-            c.alignment = Alignment(horizontal="left", vertical="center",
-                                    indent=1)
+            current_row += 1
+            ws.merged_cells.add(f"A{current_row}:{last_col}{current_row}")
             ws.row_dimensions[current_row].height = 18
+            ws.append([_cell(
+                f"  {glabel}  ({len(group_rows)} Rads\u00e4tze)",
+                font=SECTION_FONT,
+                fill=group_fill,
+                alignment=SECTION_ALIGN)])
 
             # Column header row
             current_row += 1
-            for col_idx, header in enumerate(col_headers, 1):
-                c = ws.cell(row=current_row, column=col_idx, value=header)
-                c.font = Font(bold=True, color="FFFFFF")
-                c.fill = HEADER_FILL
-                c.border = FULL_BORDER
-                c.alignment = Alignment(horizontal="center", vertical="center")
             ws.row_dimensions[current_row].height = 16
+            ws.append([
+                _cell(header,
+                      font=HEADER_FONT,
+                      fill=HEADER_FILL,
+                      border=FULL_BORDER,
+                      alignment=CENTER_ALIGN)
+                for header in col_headers
+            ])
 
             # Data rows
             for i, r in enumerate(group_rows):
@@ -315,33 +461,22 @@ def export_xlsx_snapshot(target_path: str | None = None) -> str:
                     "\u26a0" if r.tires_need_renewal else "",
                     "",
                 ]
-                for col_idx, val in enumerate(values, 1):
-                    c = ws.cell(row=current_row, column=col_idx, value=val)
-                    c.border = FULL_BORDER
-                    c.alignment = Alignment(vertical="center")
-                    if fill:
-                        c.fill = fill
-                    if col_idx == num_cols:
-                        c.alignment = Alignment(horizontal="center",
-                                                vertical="center")
                 ws.row_dimensions[current_row].height = 15
-
-        # Print settings: landscape, fit to one page wide
-        ws.page_setup.orientation = "landscape"
-        ws.page_setup.fitToWidth = 1
-        ws.page_setup.fitToHeight = 0
-        ws.page_setup.fitToPage = True
-        ws.page_margins.left = 0.5
-        ws.page_margins.right = 0.5
-        ws.page_margins.top = 0.75
-        ws.page_margins.bottom = 0.75
+                ws.append([
+                    _cell(val, fill=fill, border=FULL_BORDER,
+                          alignment=align)
+                    for val, align in zip(values, data_aligns, strict=True)
+                ])
 
         wb.save(target_path)
+        _bump_backup_generation()
         db.add(AuditLog(
             action="backup_xlsx",
             details=f"XLSX exportiert: {os.path.basename(target_path)}"
         ))
-        db.commit()
+        if own_session:
+            db.commit()
         return target_path
     finally:
-        SessionLocal.remove()
+        if own_session:
+            SessionLocal.remove()
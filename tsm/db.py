@@ -8,14 +8,21 @@ DB
 # ========================================================
 # IMPORTS
 # ========================================================
-from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy import column, create_engine, event, inspect, text
 from sqlalchemy.orm import scoped_session, sessionmaker
 
 # --------------------------------------------------------
 # Local Imports
 # --------------------------------------------------------
 from config import DB_PATH
-from tsm.models import AuditLog, Base, Settings  # ensure models import happens before create_all
+from tsm.models import (  # ensure models import happens before create_all
+    FTS_ENABLED,
+    WHEELSET_FTS_DDL,
+    AuditLog,
+    Base,
+    Settings,
+    WheelSet,
+)
 
 # ========================================================
 # GLOBALS
@@ -43,13 +50,25 @@ def set_sqlite_pragma(dbapi_connection, connection_record):
         "lower", 1,
         lambda s: s.lower() if isinstance(s, str) else s
     )
-    cursor = dbapi_connection.cursor()
-    try:
-        cursor.execute("PRAGMA journal_mode=WAL;")
-        cursor.execute("PRAGMA foreign_keys=ON;")
-        cursor.execute("PRAGMA secure_delete=ON;")
-    finally:
-        cursor.close()
+    execute = dbapi_connection.execute
+    execute("PRAGMA journal_mode=WAL;")
+    # WAL + NORMAL only fsyncs at checkpoints instead of on every
+    # commit; a power loss can drop the last transactions but never
+    # corrupts the database.
+    execute("PRAGMA synchronous=NORMAL;")
+    # Wait for a competing writer (e.g. the backup thread's audit commit)
+    # instead of failing with "database is locked".  Stated explicitly so
+    # it does not hinge on the driver's connect() default.
+    execute("PRAGMA busy_timeout=5000;")
+    execute("PRAGMA temp_store=MEMORY;")
+    execute("PRAGMA cache_size=-65536;")  # 64 MB page cache
+    # Serve reads from memory-mapped pages instead of read() syscalls
+    execute("PRAGMA mmap_size=268435456;")  # 256 MB
+    execute("PRAGMA foreign_keys=ON;")
+    # Deliberately kept despite the extra write I/O on DELETE: removed
+    # customer records (names, plates) must not linger in free pages
+    # that end up in copied backup files.
+    execute("PRAGMA secure_delete=ON;")
 
 
 # ========================================================
@@ -119,6 +138,16 @@ def _migrate():
                     conn.execute(text(
                         f"ALTER TABLE wheel_sets ADD COLUMN {col} {typ}"
                     ))
+            # Older databases predate the search index: create it and
+            # fill it from the existing rows once.
+            if (FTS_ENABLED
+                    and "wheel_sets_fts" not in insp.get_table_names()):
+                for stmt in WHEELSET_FTS_DDL:
+                    conn.exec_driver_sql(stmt)
+                conn.exec_driver_sql(
+                    "INSERT INTO wheel_sets_fts(wheel_sets_fts) "
+                    "VALUES ('rebuild')"
+                )
 
 
 _migrate()
@@ -138,7 +167,33 @@ def get_or_create_settings(db) -> Settings:
     return s
 
 
+def wheelset_search_filter(q: str):
+    """Return a WHERE clause matching *q* as a substring of any text column.
+
+    Terms of three or more characters go through the trigram FTS5 index
+    (``wheel_sets_fts``) instead of scanning every row with
+    ``LIKE '%q%'``.  Shorter terms, which trigrams cannot match, and
+    SQLite builds without FTS5 fall back to the case-insensitive LIKE.
+    """
+    if FTS_ENABLED and len(q) >= 3:
+        phrase = '"' + q.replace('"', '""') + '"'
+        matches = text(
+            "SELECT rowid FROM wheel_sets_fts WHERE wheel_sets_fts MATCH :fts"
+        ).bindparams(fts=phrase).columns(column("rowid"))
+        return WheelSet.id.in_(matches)
+    like = f"%{q}%"
+    return (
+        (WheelSet.customer_name.ilike(like)) |
+        (WheelSet.license_plate.ilike(like)) |
+        (WheelSet.car_type.ilike(like)) |
+        (WheelSet.note.ilike(like))
+    )
+
+
 def log_action(db, action: str, wheelset_id=None, details=None) -> None:
-    """Append an entry to the AuditLog table and commit."""
+    """Add an AuditLog entry to *db*'s current transaction.
+
+    Does not commit: callers log before committing their main change so
+    the change and its audit entry are written in one transaction.
+    """
     db.add(AuditLog(action=action, wheelset_id=wheelset_id, details=details))
-    db.commit()
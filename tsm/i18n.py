@@ -454,6 +454,19 @@ _CATALOGUE: dict[str, dict[str, str]] = {
 }
 
 
+# ── Resolved lookup tables ────────────────────────────────────────────────────
+# The catalogue is static, so the locale → default-locale → key fallback
+# is resolved once at import.  Templates call ``_()`` dozens of times per
+# page; each call is then a single dict lookup.
+_RESOLVED: dict[str, dict[str, str]] = {
+    locale: {
+        key: entry.get(locale) or entry.get(DEFAULT_LOCALE) or key
+        for key, entry in _CATALOGUE.items()
+    }
+    for locale in SUPPORTED_LOCALES
+}
+
+
 # ── Public API ────────────────────────────────────────────────────────────────
 
 def get_locale() -> str:
@@ -471,11 +484,8 @@ def gettext(key: str, **kwargs) -> str:
     Supports simple ``{placeholder}`` substitution via kwargs:
         gettext("positions_saved", n=5)
     """
-    locale = get_locale()
-    entry = _CATALOGUE.get(key)
-    if entry is None:
-        return key  # unknown key — return as-is so nothing breaks
-    text = entry.get(locale) or entry.get(DEFAULT_LOCALE) or key
+    # Unknown keys are returned as-is so nothing breaks
+    text = _RESOLVED[get_locale()].get(key, key)
     if kwargs:
         try:
             text = text.format(**kwargs)
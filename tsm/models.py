@@ -8,9 +8,12 @@ Models
 # ========================================================
 # IMPORTS
 # ========================================================
+import json
+import sqlite3
 from datetime import UTC, datetime
+from functools import lru_cache
 
-from sqlalchemy import Boolean, Column, DateTime, Integer, String, Text, UniqueConstraint
+from sqlalchemy import Boolean, Column, DateTime, Integer, String, Text, UniqueConstraint, event
 from sqlalchemy.orm import declarative_base
 
 # ========================================================
@@ -58,6 +61,62 @@ class WheelSet(Base):
     )
 
 
+# --------------------------------------------------------
+# Full-text search index for WheelSet
+# --------------------------------------------------------
+def _probe_fts5_trigram() -> bool:
+    """Return True if the linked SQLite supports FTS5 with trigrams (>= 3.34)."""
+    con = sqlite3.connect(":memory:")
+    try:
+        con.execute(
+            "CREATE VIRTUAL TABLE t USING fts5(x, tokenize='trigram')")
+        return True
+    except sqlite3.Error:
+        return False
+    finally:
+        con.close()
+
+
+FTS_ENABLED = _probe_fts5_trigram()
+
+# External-content FTS5 table over the searchable text columns.  The
+# trigram tokenizer matches arbitrary substrings (like LIKE '%x%') and
+# folds Unicode case, so umlaut searches keep working.  Triggers keep
+# the index in sync with wheel_sets.
+WHEELSET_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS wheel_sets_fts USING fts5("
+    "customer_name, license_plate, car_type, note, "
+    "content='wheel_sets', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS wheel_sets_fts_ai "
+    "AFTER INSERT ON wheel_sets BEGIN "
+    "INSERT INTO wheel_sets_fts(rowid, customer_name, license_plate, "
+    "car_type, note) VALUES (new.id, new.customer_name, "
+    "new.license_plate, new.car_type, new.note); END",
+    "CREATE TRIGGER IF NOT EXISTS wheel_sets_fts_ad "
+    "AFTER DELETE ON wheel_sets BEGIN "
+    "INSERT INTO wheel_sets_fts(wheel_sets_fts, rowid, customer_name, "
+    "license_plate, car_type, note) VALUES ('delete', old.id, "
+    "old.customer_name, old.license_plate, old.car_type, old.note); END",
+    "CREATE TRIGGER IF NOT EXISTS wheel_sets_fts_au "
+    "AFTER UPDATE OF customer_name, license_plate, car_type, note "
+    "ON wheel_sets BEGIN "
+    "INSERT INTO wheel_sets_fts(wheel_sets_fts, rowid, customer_name, "
+    "license_plate, car_type, note) VALUES ('delete', old.id, "
+    "old.customer_name, old.license_plate, old.car_type, old.note); "
+    "INSERT INTO wheel_sets_fts(rowid, customer_name, license_plate, "
+    "car_type, note) VALUES (new.id, new.customer_name, "
+    "new.license_plate, new.car_type, new.note); END",
+)
+
+
+@event.listens_for(WheelSet.__table__, "after_create")
+def _create_wheelset_fts(target, connection, **kw):
+    if connection.dialect.name != "sqlite" or not FTS_ENABLED:
+        return
+    for stmt in WHEELSET_FTS_DDL:
+        connection.exec_driver_sql(stmt)
+
+
 class Settings(Base):
     """
     Settings Class
@@ -92,17 +151,10 @@ class Settings(Base):
     @property
     def visible_fields(self) -> list[str]:
         """Return list of individually enabled optional field names."""
-        import json
-        if not self.visible_fields_json:
-            return []
-        try:
-            return json.loads(self.visible_fields_json)
-        except (json.JSONDecodeError, TypeError):
-            return []
+        return list(_parse_visible_fields(self.visible_fields_json))
 
     @visible_fields.setter
     def visible_fields(self, fields: list[str]) -> None:
-        import json
         valid = [f for f in fields if f in self.OPTIONAL_FIELDS]
         self.visible_fields_json = json.dumps(valid) if valid else None
 
@@ -114,7 +166,23 @@ class Settings(Base):
         """
         if self.enable_tire_details:
             return True
-        return field in self.visible_fields
+        return field in _parse_visible_fields(self.visible_fields_json)
+
+
+@lru_cache(maxsize=32)
+def _parse_visible_fields(raw: str | None) -> tuple[str, ...]:
+    """Decode ``Settings.visible_fields_json``.
+
+    Templates call ``is_field_visible`` several times per table row, so
+    the decoded value is cached per JSON string instead of re-parsed.
+    """
+    if not raw:
+        return ()
+    try:
+        fields = json.loads(raw)
+    except (json.JSONDecodeError, TypeError):
+        return ()
+    return tuple(fields) if isinstance(fields, list) else ()
 
 
 class AuditLog(Base):
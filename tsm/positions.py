@@ -11,6 +11,8 @@ Positions Logic
 import json
 import re
 
+from sqlalchemy import select, union
+
 from tsm.models import DisabledPosition, Settings, WheelSet
 
 # ========================================================
@@ -26,8 +28,15 @@ GARAGE_POSITIONS = ["L", "M", "R"]
 
 RE_CONTAINER = re.compile(r"^C([1-4])([RL])([OMU])(LL|L|MM|M|RR|R)$")
 RE_GARAGE = re.compile(r"^GR([1-8])([OMU])([LMR])$")
+
+# Sort ranks used by position_sort_key
+_SIDE_ORDER = {"R": 0, "L": 1}
+_LVL_ORDER = {"O": 0, "M": 1, "U": 2}
+_CPOS_ORDER = {v: i for i, v in enumerate(CONTAINER_POSITIONS)}
+_GPOS_ORDER = {v: i for i, v in enumerate(GARAGE_POSITIONS)}
 ALL_POSITIONS = None
 SORTED_POSITIONS = None
+_SORT_KEY: dict = {}
 
 
 # ========================================================
@@ -48,10 +57,18 @@ def all_valid_positions():
 
 
 def is_valid_position(code: str) -> bool:
-    return bool(RE_CONTAINER.match(code) or RE_GARAGE.match(code))
+    # ALL_POSITIONS holds exactly the codes RE_CONTAINER/RE_GARAGE accept
+    return code in ALL_POSITIONS
 
 
 def position_sort_key(code: str):
+    # Canonical codes come from the table built at import; only unknown
+    # (e.g. custom) codes go through the regexes.
+    key = _SORT_KEY.get(code)
+    return key if key is not None else _compute_sort_key(code)
+
+
+def _compute_sort_key(code: str):
     if code.startswith("C"):
         m = RE_CONTAINER.match(code)
         if not m:
@@ -60,10 +77,7 @@ def position_sort_key(code: str):
         side = m.group(2)
         lvl = m.group(3)
         p = m.group(4)
-        side_order = {"R": 0, "L": 1}[side]
-        lvl_order = {"O": 0, "M": 1, "U": 2}[lvl]
-        pos_order = {v: i for i, v in enumerate(CONTAINER_POSITIONS)}[p]
-        return (0, c, side_order, lvl_order, pos_order)
+        return (0, c, _SIDE_ORDER[side], _LVL_ORDER[lvl], _CPOS_ORDER[p])
     else:
         m = RE_GARAGE.match(code)
         if not m:
@@ -71,19 +85,21 @@ def position_sort_key(code: str):
         g = int(m.group(1))
         lvl = m.group(2)
         p = m.group(3)
-        lvl_order = {"O": 0, "M": 1, "U": 2}[lvl]
-        pos_order = {v: i for i, v in enumerate(GARAGE_POSITIONS)}[p]
-        return (1, g, lvl_order, pos_order)
+        return (1, g, _LVL_ORDER[lvl], _GPOS_ORDER[p])
 
 
 def get_occupied_positions(db) -> set[str]:
-    rows = db.query(WheelSet.storage_position).all()
-    return {r[0] for r in rows}
+    return set(db.scalars(select(WheelSet.storage_position)))
 
 
 def get_disabled_positions(db) -> set[str]:
-    rows = db.query(DisabledPosition.code).all()
-    return {r[0] for r in rows}
+    return set(db.scalars(select(DisabledPosition.code)))
+
+
+def get_blocked_positions(db) -> set[str]:
+    """Occupied and disabled codes together, in a single UNION query."""
+    return set(db.scalars(union(select(WheelSet.storage_position),
+                                select(DisabledPosition.code))))
 
 
 def disable_position(db, code: str, reason: str | None = None) -> bool:
@@ -92,7 +108,7 @@ def disable_position(db, code: str, reason: str | None = None) -> bool:
     """
     if not is_valid_position(code):
         return False
-    if db.get(DisabledPosition, code):
+    if db.query(db.query(DisabledPosition).filter_by(code=code).exists()).scalar():
         return False
     db.add(DisabledPosition(code=code, reason=reason))
     db.commit()
@@ -103,46 +119,60 @@ def enable_position(db, code: str) -> bool:
     """
     Remove a position from the disabled list. Returns True if removed, else False.
     """
-    row = db.get(DisabledPosition, code)
-    if not row:
+    deleted = db.query(DisabledPosition).filter_by(code=code).delete()
+    if not deleted:
         return False
-    db.delete(row)
     db.commit()
     return True
 
 
-def is_usable_position(db, code: str) -> bool:
+def is_usable_position(db, code: str, disabled=None) -> bool:
     """
     Structurally valid and not disabled.
+
+    Pass *disabled* when the caller already holds the disabled set to skip
+    the query.
     """
-    return is_valid_position(code) and (code not in get_disabled_positions(db))
+    if not is_valid_position(code):
+        return False
+    if disabled is None:
+        disabled = get_disabled_positions(db)
+    return code not in disabled
 
 
 def first_free_position(db):
-    occupied = get_occupied_positions(db)
-    disabled = get_disabled_positions(db)
-    effective = get_effective_positions(db)
-    for code in effective:
-        if code not in occupied and code not in disabled:
+    blocked = get_blocked_positions(db)
+    for code in get_effective_positions(db):
+        if code not in blocked:
             return code
     return None
 
 
-def free_positions(db):
-    occupied = get_occupied_positions(db)
-    disabled = get_disabled_positions(db)
-    effective = get_effective_positions(db)
-    return [
-        code for code in effective
-        if code not in occupied and code not in disabled
-    ]
+def free_positions(db, occupied=None, disabled=None, effective=None):
+    """Return the effective positions that are neither occupied nor disabled.
+
+    Callers that already hold any of the three collections can pass them
+    in to skip the corresponding query.
+    """
+    if occupied is None and disabled is None:
+        blocked = get_blocked_positions(db)
+    else:
+        if occupied is None:
+            occupied = get_occupied_positions(db)
+        if disabled is None:
+            disabled = get_disabled_positions(db)
+        blocked = occupied | disabled
+    if effective is None:
+        effective = get_effective_positions(db)
+    return [code for code in effective if code not in blocked]
 
 
 # ========================================================
 # GENERATE POSITIONS AND SORT
 # ========================================================
-ALL_POSITIONS = all_valid_positions()
-SORTED_POSITIONS = sorted(ALL_POSITIONS, key=position_sort_key)
+ALL_POSITIONS = frozenset(all_valid_positions())
+_SORT_KEY = {code: _compute_sort_key(code) for code in ALL_POSITIONS}
+SORTED_POSITIONS = tuple(sorted(ALL_POSITIONS, key=_SORT_KEY.__getitem__))
 
 
 # ========================================================
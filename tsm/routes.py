@@ -9,14 +9,16 @@ All route functions are defined at module level and registered in
 ``register_routes(app)`` via ``app.add_url_rule()``.  This keeps each
 handler independently importable and directly testable.
 
-Dark mode is cached in ``app.config["_TSM_DARK_MODE"]`` and refreshed
-via ``_refresh_dark_mode()`` at startup and after every settings save.
+Dark mode and the UI language are cached in ``app.config["_TSM_DARK_MODE"]``
+and ``app.config["_TSM_LOCALE"]`` and refreshed via
+``_refresh_settings_cache()`` at startup and after every settings save.
 """
 # ========================================================
 # IMPORTS
 # ========================================================
 import logging as _logging
 import os
+import re
 from collections import defaultdict
 from datetime import datetime
 
@@ -32,18 +34,26 @@ from flask import (
     send_from_directory,
     url_for,
 )
+from sqlalchemy import func, select
 from sqlalchemy.exc import IntegrityError
 
 from config import BACKUP_DIR
-from tsm.backup_manager import export_csv_snapshot
-from tsm.db import SessionLocal, get_or_create_settings, log_action
+from tsm.backup_manager import (
+    BackupManager,
+    backup_generation,
+    export_csv_snapshot,
+    notify_settings_changed,
+)
+from tsm.db import SessionLocal, get_or_create_settings, log_action, wheelset_search_filter
+from tsm.i18n import SUPPORTED_LOCALES
 from tsm.i18n import gettext as _
 from tsm.models import AuditLog, Settings, WheelSet
 from tsm.positions import (
     RE_CONTAINER,
     RE_GARAGE,
     SORTED_POSITIONS,
-    first_free_position,
+    disable_position,
+    enable_position,
     free_positions,
     get_disabled_positions,
     get_effective_positions,
@@ -69,25 +79,61 @@ from tsm.utils import (
 
 _log = _logging.getLogger("TSM.routes")
 
+# Built once so the ORDER BY clause objects (and their compiled SQL in
+# SQLAlchemy's statement cache) are reused across list requests.
+_SORT_MAP = {
+    "updated_desc":  WheelSet.updated_at.desc(),
+    "updated_asc":   WheelSet.updated_at.asc(),
+    "customer_asc":  WheelSet.customer_name.asc(),
+    "customer_desc": WheelSet.customer_name.desc(),
+    "plate_asc":     WheelSet.license_plate.asc(),
+    "plate_desc":    WheelSet.license_plate.desc(),
+    "position_asc":  WheelSet.storage_position.asc(),
+    "position_desc": WheelSet.storage_position.desc(),
+}
+
+# Columns the wheel-set list template reads; selected as plain rows so
+# the list page skips ORM instance construction and identity tracking.
+_LIST_COLUMNS = (
+    WheelSet.id,
+    WheelSet.customer_name,
+    WheelSet.license_plate,
+    WheelSet.car_type,
+    WheelSet.note,
+    WheelSet.storage_position,
+    WheelSet.season,
+    WheelSet.rim_type,
+    WheelSet.exchange_note,
+    WheelSet.tires_need_renewal,
+)
+
+# Allowed values for the enum-like optional tire fields (see models.WheelSet)
+_SEASONS = frozenset(("sommer", "winter", "allwetter"))
+_RIM_TYPES = frozenset(("stahl", "alu"))
+
 
 # ========================================================
-# DARK-MODE CACHE HELPER
+# SETTINGS CACHE HELPER
 # ========================================================
 
-def _refresh_dark_mode() -> None:
-    """Sync the dark-mode flag from the DB into ``current_app.config``.
+def _refresh_settings_cache() -> None:
+    """Sync the dark-mode flag and UI language from the DB into
+    ``current_app.config``.
 
     Safe to call both at startup (inside an ``app.app_context()``) and
     from within request handlers (where ``current_app`` is available).
+    Inside a request the shared session is released on teardown; the
+    startup caller releases it itself.
     """
     db = SessionLocal()
     try:
         s = db.query(Settings).first()
         current_app.config["_TSM_DARK_MODE"] = s.dark_mode if s else False
+        current_app.config["_TSM_LOCALE"] = (
+            s.language if s and s.language in SUPPORTED_LOCALES else "de")
     except Exception:
         current_app.config.setdefault("_TSM_DARK_MODE", False)
-    finally:
-        SessionLocal.remove()
+        current_app.config.setdefault("_TSM_LOCALE", "de")
 
 
 # ========================================================
@@ -113,11 +159,10 @@ def _apply_optional_tire_fields(w, s) -> None:
         w.tire_age = request.form.get("tire_age", "").strip() or None
     if s.is_field_visible("season"):
         season = request.form.get("season", "").strip()
-        w.season = season if season in (
-            "sommer", "winter", "allwetter") else None
+        w.season = season if season in _SEASONS else None
     if s.is_field_visible("rim_type"):
         rim = request.form.get("rim_type", "").strip()
-        w.rim_type = rim if rim in ("stahl", "alu") else None
+        w.rim_type = rim if rim in _RIM_TYPES else None
     if s.is_field_visible("exchange_note"):
         w.exchange_note = (
             request.form.get("exchange_note", "").strip() or None
@@ -130,449 +175,435 @@ def _apply_optional_tire_fields(w, s) -> None:
 
 def index():
     db = SessionLocal()
-    try:
-        total_positions = len(get_effective_positions(db))
-        disabled = get_disabled_positions(db)
-        occupied = get_occupied_positions(db)
-        free_pos = free_positions(db)
-        total_wheelsets = db.query(WheelSet).count()
-        usable_positions = total_positions - len(disabled)
-        occupancy_pct = (
-            round(total_wheelsets / usable_positions * 100)
-            if usable_positions > 0 else 0
-        )
-        recent_activity = (
-            db.query(AuditLog)
-            .order_by(AuditLog.created_at.desc())
-            .limit(5)
-            .all()
-        )
-        from sqlalchemy import func
-        top_cars = (
-            db.query(WheelSet.car_type,
-                     func.count(WheelSet.id).label("cnt"))
-            .group_by(WheelSet.car_type)
-            .order_by(func.count(WheelSet.id).desc())
-            .limit(3)
-            .all()
-        )
-        nf = first_free_position(db)
-        return render_template(
-            "index.html",
-            total=total_wheelsets,
-            total_positions=total_positions,
-            usable_positions=usable_positions,
-            occupied_count=len(occupied),
-            free_count=len(free_pos),
-            free_positions=free_pos,
-            occupancy_pct=occupancy_pct,
-            recent_activity=recent_activity,
-            top_cars=top_cars,
-            next_free=nf,
-            active="home",
-        )
-    finally:
-        SessionLocal.remove()
+    effective = get_effective_positions(db)
+    total_positions = len(effective)
+    disabled = get_disabled_positions(db)
+    occupied = get_occupied_positions(db)
+    free_pos = free_positions(db, occupied, disabled, effective)
+    # storage_position is NOT NULL and UNIQUE: one wheel set per code
+    total_wheelsets = len(occupied)
+    usable_positions = total_positions - len(disabled)
+    occupancy_pct = (
+        round(total_wheelsets / usable_positions * 100)
+        if usable_positions > 0 else 0
+    )
+    recent_activity = (
+        db.query(AuditLog)
+        .order_by(AuditLog.created_at.desc())
+        .limit(5)
+        .all()
+    )
+    top_cars = (
+        db.query(WheelSet.car_type,
+                 func.count(WheelSet.id).label("cnt"))
+        .group_by(WheelSet.car_type)
+        .order_by(func.count(WheelSet.id).desc())
+        .limit(3)
+        .all()
+    )
+    nf = free_pos[0] if free_pos else None
+    return render_template(
+        "index.html",
+        total=total_wheelsets,
+        total_positions=total_positions,
+        usable_positions=usable_positions,
+        occupied_count=len(occupied),
+        free_count=len(free_pos),
+        free_positions=free_pos,
+        occupancy_pct=occupancy_pct,
+        recent_activity=recent_activity,
+        top_cars=top_cars,
+        next_free=nf,
+        active="home",
+    )
 
 
 def list_wheelsets():
     db = SessionLocal()
-    try:
-        q = request.args.get("q", "").strip()
-        sort = request.args.get("sort", "updated_desc")
-        filter_pos = request.args.get("filter_pos", "")
-        filter_season = request.args.get("filter_season", "")
-        filter_renewal = request.args.get("filter_renewal", "")
-
-        query = db.query(WheelSet)
-        if q:
-            like = f"%{q}%"
-            query = query.filter(
-                (WheelSet.customer_name.ilike(like)) |
-                (WheelSet.license_plate.ilike(like)) |
-                (WheelSet.car_type.ilike(like)) |
-                (WheelSet.note.ilike(like))
-            )
-        if filter_pos == "container":
-            query = query.filter(WheelSet.storage_position.like("C%"))
-        elif filter_pos == "garage":
-            query = query.filter(WheelSet.storage_position.like("GR%"))
-        if filter_season:
-            query = query.filter(WheelSet.season == filter_season)
-        if filter_renewal == "1":
-            query = query.filter(WheelSet.tires_need_renewal == True)  # noqa: E712
-
-        sort_map = {
-            "updated_desc":  WheelSet.updated_at.desc(),
-            "updated_asc":   WheelSet.updated_at.asc(),
-            "customer_asc":  WheelSet.customer_name.asc(),
-            "customer_desc": WheelSet.customer_name.desc(),
-            "plate_asc":     WheelSet.license_plate.asc(),
-            "plate_desc":    WheelSet.license_plate.desc(),
-            "position_asc":  WheelSet.storage_position.asc(),
-            "position_desc": WheelSet.storage_position.desc(),
-        }
-        order = sort_map.get(sort, WheelSet.updated_at.desc())
-        items = query.order_by(order).all()
-        s = get_or_create_settings(db)
-
-        overdue_ids: set[int] = set()
-        if s.is_field_visible("season"):
-            month = datetime.now().month
-            due_season = overdue_season(month)
-            if due_season is not None:
-                for w in items:
-                    if w.season == due_season:
-                        overdue_ids.add(w.id)
-
-        return render_template(
-            "wheelsets_list.html",
-            items=items,
-            settings=s,
-            overdue_ids=overdue_ids,
-            active="wheelsets",
-            sort=sort,
-            filter_pos=filter_pos,
-            filter_season=filter_season,
-            filter_renewal=filter_renewal,
-        )
-    finally:
-        SessionLocal.remove()
+    q = request.args.get("q", "").strip()
+    sort = request.args.get("sort", "updated_desc")
+    filter_pos = request.args.get("filter_pos", "")
+    filter_season = request.args.get("filter_season", "")
+    filter_renewal = request.args.get("filter_renewal", "")
+
+    query = select(*_LIST_COLUMNS)
+    if q:
+        query = query.where(wheelset_search_filter(q))
+    # Prefix filters as half-open ranges so SQLite can walk the
+    # storage_position index (LIKE is case-insensitive and can't).
+    if filter_pos == "container":
+        query = query.where(WheelSet.storage_position >= "C",
+                            WheelSet.storage_position < "D")
+    elif filter_pos == "garage":
+        query = query.where(WheelSet.storage_position >= "GR",
+                            WheelSet.storage_position < "GS")
+    if filter_season:
+        query = query.where(WheelSet.season == filter_season)
+    if filter_renewal == "1":
+        query = query.where(WheelSet.tires_need_renewal == True)  # noqa: E712
+
+    order = _SORT_MAP.get(sort, WheelSet.updated_at.desc())
+    items = db.execute(query.order_by(order)).all()
+    s = get_or_create_settings(db)
+
+    overdue_ids: set[int] = set()
+    if s.is_field_visible("season"):
+        month = datetime.now().month
+        due_season = overdue_season(month)
+        if due_season is not None:
+            for w in items:
+                if w.season == due_season:
+                    overdue_ids.add(w.id)
+
+    return render_template(
+        "wheelsets_list.html",
+        items=items,
+        settings=s,
+        overdue_ids=overdue_ids,
+        active="wheelsets",
+        sort=sort,
+        filter_pos=filter_pos,
+        filter_season=filter_season,
+        filter_renewal=filter_renewal,
+    )
 
 
 def create_wheelset():
     db = SessionLocal()
-    try:
-        suggested = request.args.get("suggested") \
-            if request.method == "GET" else None
-        occupied = get_occupied_positions(db)
-        disabled = get_disabled_positions(db)
-        effective = get_effective_positions(db)
-        pos_choices = [p for p in effective
-                       if p not in occupied and p not in disabled]
-        s = get_or_create_settings(db)
-
-        if request.method == "POST":
-            validate_csrf()
-            customer_name = request.form.get("customer_name", "").strip()
-            license_plate = normalize_license_plate(
-                request.form.get("license_plate", ""))
-            car_type = request.form.get("car_type", "").strip()
-            note = (request.form.get("note", "") or "").strip() or None
-            storage_position = request.form.get(
-                "storage_position", "").strip()
-
-            if not (customer_name and license_plate and car_type and
-                    storage_position):
-                flash(_("fill_required_fields"), "error")
-                return redirect(url_for("create_wheelset"))
-
-            if not is_valid_license_plate(license_plate):
-                flash(_("invalid_plate"), "error")
-                return redirect(url_for("create_wheelset"))
-
-            if not is_valid_position(storage_position):
-                flash(_("invalid_position"), "error")
-                return redirect(url_for("create_wheelset"))
-
-            if not is_usable_position(db, storage_position):
-                flash(_("position_disabled"), "error")
-                return redirect(url_for("create_wheelset"))
-
-            if storage_position in occupied:
-                flash(_("position_occupied"), "error")
-                return redirect(url_for("create_wheelset"))
-
-            w = WheelSet(
-                customer_name=customer_name,
-                license_plate=license_plate,
-                car_type=car_type,
-                note=note,
-                storage_position=storage_position
-            )
-            # Tire renewal flag — always accepted
-            w.tires_need_renewal = (
-                request.form.get("tires_need_renewal") == "1"
-            )
-            _apply_optional_tire_fields(w, s)
-            db.add(w)
-            try:
-                db.commit()
-            except IntegrityError:
-                db.rollback()
-                flash(_("position_conflict"), "error")
-                return redirect(url_for("create_wheelset"))
-
+    suggested = request.args.get("suggested") \
+        if request.method == "GET" else None
+    occupied = get_occupied_positions(db)
+    disabled = get_disabled_positions(db)
+    pos_choices = free_positions(db, occupied, disabled)
+    s = get_or_create_settings(db)
+
+    if request.method == "POST":
+        validate_csrf()
+        customer_name = request.form.get("customer_name", "").strip()
+        license_plate = normalize_license_plate(
+            request.form.get("license_plate", ""))
+        car_type = request.form.get("car_type", "").strip()
+        note = (request.form.get("note", "") or "").strip() or None
+        storage_position = request.form.get(
+            "storage_position", "").strip()
+
+        if not (customer_name and license_plate and car_type and
+                storage_position):
+            flash(_("fill_required_fields"), "error")
+            return redirect(url_for("create_wheelset"))
+
+        if not is_valid_license_plate(license_plate):
+            flash(_("invalid_plate"), "error")
+            return redirect(url_for("create_wheelset"))
+
+        if not is_valid_position(storage_position):
+            flash(_("invalid_position"), "error")
+            return redirect(url_for("create_wheelset"))
+
+        if not is_usable_position(db, storage_position, disabled):
+            flash(_("position_disabled"), "error")
+            return redirect(url_for("create_wheelset"))
+
+        if storage_position in occupied:
+            flash(_("position_occupied"), "error")
+            return redirect(url_for("create_wheelset"))
+
+        w = WheelSet(
+            customer_name=customer_name,
+            license_plate=license_plate,
+            car_type=car_type,
+            note=note,
+            storage_position=storage_position
+        )
+        # Tire renewal flag — always accepted
+        w.tires_need_renewal = (
+            request.form.get("tires_need_renewal") == "1"
+        )
+        _apply_optional_tire_fields(w, s)
+        db.add(w)
+        try:
+            # flush() runs the INSERT so the new id is known without
+            # re-reading the row after commit; the wheel set and its
+            # audit entry are then committed together.
+            db.flush()
             log_action(db,
                        "create",
                        w.id,
-                       f"Angelegt @ {w.storage_position} fuer "
-                       f"{w.customer_name} [{w.license_plate}]")
-            flash(_("wheelset_created"), "success")
-            return redirect(url_for("list_wheelsets"))
-
-        return render_template("wheelset_form.html", w=None, editing=False,
-                               positions=pos_choices, suggested=suggested,
-                               settings=s, active="wheelsets")
-    finally:
-        SessionLocal.remove()
+                       f"Angelegt @ {storage_position} fuer "
+                       f"{customer_name} [{license_plate}]")
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            flash(_("position_conflict"), "error")
+            return redirect(url_for("create_wheelset"))
+
+        flash(_("wheelset_created"), "success")
+        return redirect(url_for("list_wheelsets"))
+
+    return render_template("wheelset_form.html", w=None, editing=False,
+                           positions=pos_choices, suggested=suggested,
+                           settings=s, active="wheelsets")
 
 
 def edit_wheelset(wid):
     db = SessionLocal()
-    try:
-        w = db.get(WheelSet, wid)
-        if not w:
-            abort(404, description="Radsatz nicht gefunden.")
-
-        occupied = get_occupied_positions(db)
-        occupied.discard(w.storage_position)
-        disabled = get_disabled_positions(db)
-        effective = get_effective_positions(db)
-        pos_choices = [
-            p for p in effective if
-            (p not in occupied)
-            and (p not in disabled
-                 or p == w.storage_position)
-        ]
-        s = get_or_create_settings(db)
-        if request.method == "POST":
-            validate_csrf()
-            customer_name = request.form.get("customer_name", "").strip()
-            license_plate = normalize_license_plate(
-                request.form.get("license_plate", ""))
-            car_type = request.form.get("car_type", "").strip()
-            note_input = (request.form.get("note") or "").strip()
-            note = None if (not note_input or note_input.lower() == "none") else note_input
-            storage_position = request.form.get(
-                "storage_position", "").strip()
-
-            if not (customer_name and license_plate and car_type and
-                    storage_position):
-                flash(_("fill_required_fields"), "error")
-                return redirect(url_for("edit_wheelset", wid=wid))
-
-            if not is_valid_license_plate(license_plate):
-                flash(_("invalid_plate"), "error")
-                return redirect(url_for("edit_wheelset", wid=wid))
-
-            if not is_valid_position(storage_position):
-                flash(_("invalid_position"), "error")
-                return redirect(url_for("edit_wheelset", wid=wid))
-
-            if storage_position in occupied:
-                flash(_("position_occupied"), "error")
-                return redirect(url_for("edit_wheelset", wid=wid))
-
-            if ((storage_position != w.storage_position) and
-                    not is_usable_position(db, storage_position)):
-                flash(_("target_position_disabled"), "error")
-                return redirect(url_for("edit_wheelset", wid=wid))
-
-            old_pos = w.storage_position
-            w.customer_name = customer_name
-            w.license_plate = license_plate
-            w.car_type = car_type
-            w.note = note
-            w.storage_position = storage_position
-
-            # Tire renewal flag — always accepted
-            w.tires_need_renewal = (
-                request.form.get("tires_need_renewal") == "1"
-            )
+    w = db.get(WheelSet, wid)
+    if not w:
+        abort(404, description="Radsatz nicht gefunden.")
+
+    occupied = get_occupied_positions(db)
+    occupied.discard(w.storage_position)
+    disabled = get_disabled_positions(db)
+    # The current position stays selectable even if it was disabled
+    pos_choices = free_positions(
+        db, occupied, disabled - {w.storage_position})
+    s = get_or_create_settings(db)
+    if request.method == "POST":
+        validate_csrf()
+        customer_name = request.form.get("customer_name", "").strip()
+        license_plate = normalize_license_plate(
+            request.form.get("license_plate", ""))
+        car_type = request.form.get("car_type", "").strip()
+        note_input = (request.form.get("note") or "").strip()
+        note = None if (not note_input or note_input.lower() == "none") else note_input
+        storage_position = request.form.get(
+            "storage_position", "").strip()
+
+        if not (customer_name and license_plate and car_type and
+                storage_position):
+            flash(_("fill_required_fields"), "error")
+            return redirect(url_for("edit_wheelset", wid=wid))
+
+        if not is_valid_license_plate(license_plate):
+            flash(_("invalid_plate"), "error")
+            return redirect(url_for("edit_wheelset", wid=wid))
+
+        if not is_valid_position(storage_position):
+            flash(_("invalid_position"), "error")
+            return redirect(url_for("edit_wheelset", wid=wid))
+
+        if storage_position in occupied:
+            flash(_("position_occupied"), "error")
+            return redirect(url_for("edit_wheelset", wid=wid))
+
+        if ((storage_position != w.storage_position) and
+                not is_usable_position(db, storage_position, disabled)):
+            flash(_("target_position_disabled"), "error")
+            return redirect(url_for("edit_wheelset", wid=wid))
+
+        old_pos = w.storage_position
+        w.customer_name = customer_name
+        w.license_plate = license_plate
+        w.car_type = car_type
+        w.note = note
+        w.storage_position = storage_position
+
+        # Tire renewal flag — always accepted
+        w.tires_need_renewal = (
+            request.form.get("tires_need_renewal") == "1"
+        )
 
-            _apply_optional_tire_fields(w, s)
+        _apply_optional_tire_fields(w, s)
 
-            try:
-                db.commit()
-            except IntegrityError:
-                db.rollback()
-                flash(_("data_conflict"), "error")
-                return redirect(url_for("edit_wheelset", wid=wid))
+        log_action(db, "update", wid,
+                   f"Geaendert: {old_pos} -> {storage_position}")
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            flash(_("data_conflict"), "error")
+            return redirect(url_for("edit_wheelset", wid=wid))
 
-            log_action(db, "update", w.id,
-                       f"Geaendert: {old_pos} -> {w.storage_position}")
-            flash(_("wheelset_updated"), "success")
-            return redirect(url_for("list_wheelsets"))
+        flash(_("wheelset_updated"), "success")
+        return redirect(url_for("list_wheelsets"))
 
-        return render_template("wheelset_form.html", w=w, editing=True,
-                               positions=pos_choices, suggested=None,
-                               settings=s, active="wheelsets")
-    finally:
-        SessionLocal.remove()
+    return render_template("wheelset_form.html", w=w, editing=True,
+                           positions=pos_choices, suggested=None,
+                           settings=s, active="wheelsets")
 
 
 def delete_wheelset_confirm(wid):
     db = SessionLocal()
-    try:
-        w = db.get(WheelSet, wid)
-        if not w:
-            abort(404, description="Radsatz nicht gefunden.")
-        return render_template("delete_confirm.html", w=w,
-                               active="wheelsets")
-    finally:
-        SessionLocal.remove()
+    w = db.get(WheelSet, wid)
+    if not w:
+        abort(404, description="Radsatz nicht gefunden.")
+    return render_template("delete_confirm.html", w=w,
+                           active="wheelsets")
 
 
 def delete_wheelset(wid):
     validate_csrf()
     db = SessionLocal()
-    try:
-        w = db.get(WheelSet, wid)
-        if not w:
-            abort(404, description="Radsatz nicht gefunden.")
-        confirm_plate = (
-            request.form.get("confirm_plate", "") or "").strip()
-        if confirm_plate != w.license_plate:
-            flash(_("confirm_failed"), "error")
-            return redirect(url_for("delete_wheelset_confirm", wid=wid))
-
-        pos = w.storage_position
-        db.delete(w)
-        db.commit()
-        log_action(db, "delete", wid, f"Geloescht @ {pos}")
-        flash(_("wheelset_deleted"), "success")
-        return redirect(url_for("list_wheelsets"))
-    finally:
-        SessionLocal.remove()
+    w = db.get(WheelSet, wid)
+    if not w:
+        abort(404, description="Radsatz nicht gefunden.")
+    confirm_plate = (
+        request.form.get("confirm_plate", "") or "").strip()
+    if confirm_plate != w.license_plate:
+        flash(_("confirm_failed"), "error")
+        return redirect(url_for("delete_wheelset_confirm", wid=wid))
+
+    pos = w.storage_position
+    db.delete(w)
+    log_action(db, "delete", wid, f"Geloescht @ {pos}")
+    db.commit()
+    flash(_("wheelset_deleted"), "success")
+    return redirect(url_for("list_wheelsets"))
 
 
 def positions():
     db = SessionLocal()
-    try:
-        nf = first_free_position(db)
-        fp = free_positions(db)
-        disabled = sorted(get_disabled_positions(db), key=position_sort_key)
-        return render_template("positions.html",
-                               next_free=nf,
-                               free_positions=fp,
-                               disabled_positions=disabled,
-                               active="positions")
-    finally:
-        SessionLocal.remove()
+    disabled_set = get_disabled_positions(db)
+    fp = free_positions(db, disabled=disabled_set)
+    nf = fp[0] if fp else None
+    disabled = sorted(disabled_set, key=position_sort_key)
+    return render_template("positions.html",
+                           next_free=nf,
+                           free_positions=fp,
+                           disabled_positions=disabled,
+                           active="positions")
 
 
 def settings():
     db = SessionLocal()
-    try:
-        s = get_or_create_settings(db)
-        if request.method == "POST":
-            validate_csrf()
-            try:
-                interval = int(request.form.get(
-                    "backup_interval_minutes", "60"))
-                copies = int(
-                    request.form.get("backup_copies", "10"))
-                s.backup_interval_minutes = max(1, interval)
-                s.backup_copies = max(1, copies)
-                s.dark_mode = (
-                    request.form.get("dark_mode") == "1"
-                )
-                s.auto_update = (
-                    request.form.get("auto_update") == "1"
-                )
-                from tsm.i18n import SUPPORTED_LOCALES
-                lang = request.form.get("language", "de")
-                s.language = lang if lang in SUPPORTED_LOCALES else "de"
-                s.enable_tire_details = (
-                    request.form.get("enable_tire_details") == "1"
-                )
-                s.enable_seasonal_tracking = (
-                    request.form.get(
-                        "enable_seasonal_tracking") == "1"
-                    and s.enable_tire_details
-                )
-                # Visible fields — only update when this specific form
-                # was submitted (sentinel present), so other settings
-                # forms on the page don't clear the saved selection.
-                if request.form.get("_visible_fields_submitted") == "1":
-                    s.visible_fields = request.form.getlist("visible_fields")
-                db.commit()
-                g._tsm_locale = s.language
-                _refresh_dark_mode()
-                flash(_("settings_saved"), "success")
-            except Exception:
-                _log.exception("Error saving settings")
-                db.rollback()
-                flash(_("settings_error"), "error")
-        return render_template(
-            "settings.html", s=s, active="settings")
-    finally:
-        SessionLocal.remove()
+    s = get_or_create_settings(db)
+    if request.method == "POST":
+        validate_csrf()
+        try:
+            interval = int(request.form.get(
+                "backup_interval_minutes", "60"))
+            copies = int(
+                request.form.get("backup_copies", "10"))
+            s.backup_interval_minutes = max(1, interval)
+            s.backup_copies = max(1, copies)
+            s.dark_mode = (
+                request.form.get("dark_mode") == "1"
+            )
+            s.auto_update = (
+                request.form.get("auto_update") == "1"
+            )
+            lang = request.form.get("language", "de")
+            s.language = lang if lang in SUPPORTED_LOCALES else "de"
+            s.enable_tire_details = (
+                request.form.get("enable_tire_details") == "1"
+            )
+            s.enable_seasonal_tracking = (
+                request.form.get(
+                    "enable_seasonal_tracking") == "1"
+                and s.enable_tire_details
+            )
+            # Visible fields — only update when this specific form
+            # was submitted (sentinel present), so other settings
+            # forms on the page don't clear the saved selection.
+            if request.form.get("_visible_fields_submitted") == "1":
+                s.visible_fields = request.form.getlist("visible_fields")
+            db.commit()
+            _refresh_settings_cache()
+            notify_settings_changed()
+            g._tsm_locale = current_app.config["_TSM_LOCALE"]
+            flash(_("settings_saved"), "success")
+        except Exception:
+            _log.exception("Error saving settings")
+            db.rollback()
+            flash(_("settings_error"), "error")
+    return render_template(
+        "settings.html", s=s, active="settings")
 
 
 def settings_positions():
-    from tsm.positions import disable_position, enable_position
     db = SessionLocal()
-    try:
-        effective = get_effective_positions(db)
-        defaults = list(SORTED_POSITIONS)
-        is_custom = effective != defaults
-        disabled = get_disabled_positions(db)
-        if request.method == "POST":
-            validate_csrf()
-            action = request.form.get("action")
-            if action == "reset":
-                reset_custom_positions(db)
-                flash(_("positions_reset"), "success")
-                return redirect(
-                    url_for("settings_positions"))
-            if action == "save":
-                raw = request.form.get("positions_text", "")
-                lines = [
-                    ln.strip()
-                    for ln in raw.splitlines()
-                    if ln.strip()
-                ]
-                if not lines:
-                    flash(_("positions_min_one"), "error")
-                    return redirect(
-                        url_for("settings_positions"))
-                save_custom_positions(db, lines)
-                flash(_("positions_saved", n=len(lines)), "success")
+    effective = get_effective_positions(db)
+    defaults = list(SORTED_POSITIONS)
+    is_custom = effective != defaults
+    disabled = get_disabled_positions(db)
+    if request.method == "POST":
+        validate_csrf()
+        action = request.form.get("action")
+        if action == "reset":
+            reset_custom_positions(db)
+            flash(_("positions_reset"), "success")
+            return redirect(
+                url_for("settings_positions"))
+        if action == "save":
+            raw = request.form.get("positions_text", "")
+            lines = [
+                ln.strip()
+                for ln in raw.splitlines()
+                if ln.strip()
+            ]
+            if not lines:
+                flash(_("positions_min_one"), "error")
                 return redirect(
                     url_for("settings_positions"))
-            if action == "toggle_disabled":
-                code = request.form.get("code", "").strip()
-                if code:
-                    if code in disabled:
-                        enable_position(db, code)
-                    else:
-                        disable_position(db, code)
-                return redirect(url_for("settings_positions"))
-        return render_template(
-            "settings_positions.html",
-            positions=effective,
-            disabled=disabled,
-            is_custom=is_custom,
-            active="settings",
-        )
-    finally:
-        SessionLocal.remove()
+            save_custom_positions(db, lines)
+            flash(_("positions_saved", n=len(lines)), "success")
+            return redirect(
+                url_for("settings_positions"))
+        if action == "toggle_disabled":
+            code = request.form.get("code", "").strip()
+            if code:
+                if code in disabled:
+                    enable_position(db, code)
+                else:
+                    disable_position(db, code)
+            return redirect(url_for("settings_positions"))
+    return render_template(
+        "settings_positions.html",
+        positions=effective,
+        disabled=disabled,
+        is_custom=is_custom,
+        active="settings",
+    )
 
 
 def impressum():
     return render_template("impressum.html", active="impressum")
 
 
-def backups():
-    seen: dict = {}
+_BACKUP_PREFIX = "wheel_storage_"
+_BACKUP_NAME_RE = re.compile(r"wheel_storage_[\w.\-]+\.(?:db|csv|xlsx)")
+
+
+def _is_backup_name(name: str) -> bool:
+    """True for file names the backups page lists and serves."""
+    return _BACKUP_NAME_RE.fullmatch(name) is not None
+
+
+# (backup dir, dir mtime, backup generation) -> grouped listing.  Rebuilt
+# only when files were added/removed or tsm.backup_manager wrote one.
+_backups_cache: tuple = (None, [])
+
+
+def _list_backup_groups() -> list[dict]:
+    """Return backup files grouped by timestamp, newest first."""
+    global _backups_cache
     try:
-        entries = os.listdir(BACKUP_DIR)
+        dir_mtime = os.stat(BACKUP_DIR).st_mtime_ns
     except FileNotFoundError:
-        entries = []
-    for f in entries:
-        if not f.startswith("wheel_storage_"):
-            continue
-        for ext in (".db", ".csv", ".xlsx"):
-            if f.endswith(ext):
-                p = os.path.join(BACKUP_DIR, f)
+        return []
+    key = (BACKUP_DIR, dir_mtime, backup_generation())
+    cached_key, cached_groups = _backups_cache
+    if cached_key == key:
+        return cached_groups
+
+    seen: dict = {}
+    fromtimestamp = datetime.fromtimestamp
+    try:
+        # scandir hands out one stat per entry (cached from the directory
+        # read on Windows) instead of separate getsize/getmtime calls.
+        with os.scandir(BACKUP_DIR) as it:
+            for entry in it:
+                f = entry.name
+                if not _is_backup_name(f):
+                    continue
                 try:
-                    size_kb = max(1, os.path.getsize(p) // 1024)
-                    mtime = datetime.fromtimestamp(
-                        os.path.getmtime(p)).strftime("%Y-%m-%d %H:%M")
-                    ts = f[len("wheel_storage_"):f.rfind(".")]
-                    ftype = ext.lstrip(".")
+                    st = entry.stat()
+                    size_kb = max(1, st.st_size // 1024)
+                    mtime = fromtimestamp(
+                        st.st_mtime).strftime("%Y-%m-%d %H:%M")
+                    dot = f.rfind(".")
+                    ts = f[len(_BACKUP_PREFIX):dot]
+                    ftype = f[dot + 1:]
                     if ts not in seen:
                         seen[ts] = {"ts": ts, "mtime": mtime, "files": []}
                     seen[ts]["files"].append(
@@ -580,23 +611,28 @@ def backups():
                     )
                 except Exception:
                     _log.exception("Error reading backup file %s", f)
+    except FileNotFoundError:
+        pass
     type_order = {"db": 0, "csv": 1, "xlsx": 2}
     groups = sorted(seen.values(), key=lambda grp: grp["ts"], reverse=True)
     for grp in groups:
         grp["files"].sort(key=lambda x: type_order.get(x["type"], 9))
+    _backups_cache = (key, groups)
+    return groups
+
+
+def backups():
     return render_template(
-        "backups.html", backup_groups=groups, active="backups"
+        "backups.html", backup_groups=_list_backup_groups(),
+        active="backups"
     )
 
 
 def inventory_print():
     db = SessionLocal()
-    try:
-        rows = db.query(WheelSet).all()
-        rows = sorted(rows,
-                      key=lambda r: position_sort_key(r.storage_position))
-    finally:
-        SessionLocal.remove()
+    rows = db.query(WheelSet).all()
+    rows = sorted(rows,
+                  key=lambda r: position_sort_key(r.storage_position))
 
     groups_map: dict = defaultdict(list)
     for r in rows:
@@ -636,10 +672,7 @@ def inventory_print():
 def download_backup(filename):
     if ("/" in filename or "\\" in filename or ".." in filename):
         abort(403)
-    if not (filename.startswith("wheel_storage_")
-            and (filename.endswith(".db")
-                 or filename.endswith(".csv")
-                 or filename.endswith(".xlsx"))):
+    if not _is_backup_name(filename):
         abort(403)
     return send_from_directory(BACKUP_DIR, filename, as_attachment=True)
 
@@ -657,11 +690,8 @@ def export_csv_now():
 
 def run_backup():
     validate_csrf()
-    from tsm.backup_manager import BackupManager
-    from tsm.db import engine
     try:
-        mgr = BackupManager(engine, BACKUP_DIR)
-        mgr.perform_backup()
+        current_app.extensions["tsm_backup_mgr"].perform_backup()
         flash(_("backup_created"), "success")
     except Exception as e:
         _log.exception("Manual backup failed")
@@ -717,7 +747,13 @@ def update_now():
 def register_routes(app) -> None:
     """Register all route handlers and the dark-mode context processor."""
     with app.app_context():
-        _refresh_dark_mode()
+        _refresh_settings_cache()
+        SessionLocal.remove()
+
+    # BackupManager used by the manual "backup now" route (never started
+    # as a thread; run.py owns the scheduled one)
+    from tsm.db import engine
+    app.extensions["tsm_backup_mgr"] = BackupManager(engine, BACKUP_DIR)
 
     @app.context_processor
     def inject_dark_mode():
@@ -27,9 +27,11 @@ import ssl
 import subprocess
 import sys
 import tempfile
+import threading
 import time
 import urllib.error
 import urllib.request
+from functools import lru_cache
 from pathlib import Path
 
 log = logging.getLogger("TSM.updater")
@@ -57,6 +59,9 @@ SERVICE_NAME = os.environ.get("TSM_SERVICE_NAME", "TireStorageManager")
 # Timeout for HTTP requests (seconds)
 HTTP_TIMEOUT = 30
 
+# Last ETag and body per URL, revalidated with If-None-Match
+_etag_cache: dict[str, tuple[str, bytes]] = {}
+
 
 def _ssl_context() -> ssl.SSLContext:
     """Return an SSL context that trusts the OS certificate store.
@@ -74,6 +79,7 @@ def _ssl_context() -> ssl.SSLContext:
 _VER_RE = re.compile(r"(\d+)\.(\d+)\.(\d+)")
 _VERSION_LINE_RE = re.compile(
     r'^\s*VERSION\s*=\s*"([^"]+)"', re.MULTILINE)
+_VER_SPLIT = re.compile(r"[.-]")
 
 
 # ── Helpers ──────────────────────────────────────────────
@@ -87,22 +93,18 @@ def _current_exe() -> Path:
     return Path(sys.executable).resolve()
 
 
+@lru_cache(maxsize=32)
 def _ver_tuple(v: str):
     """Parse version string into comparable tuple.
     Handles pre-release suffixes (e.g. 1.2.0-beta → (1, 2, 0)).
     Falls back to splitting on [.-] like tools/updater.py.
+    Cached: the same local/remote pair is compared on every update poll.
     """
     m = _VER_RE.search(v)
     if m:
         return (int(m.group(1)), int(m.group(2)), int(m.group(3)))
-    # Fallback: split on dots and dashes, coerce to int
-    parts = re.split(r"[.-]", v.strip())
-    out = []
-    for p in parts:
-        try:
-            out.append(int(p))
-        except ValueError:
-            out.append(0)
+    # Fallback: split on dots and dashes, non-numeric parts count as 0
+    out = [int(p) if p.isdecimal() else 0 for p in _VER_SPLIT.split(v.strip())]
     # Pad to at least 3 elements for consistent comparison
     while len(out) < 3:
         out.append(0)
@@ -134,12 +136,33 @@ def _nocache_url(url: str) -> str:
     return f"{url}{sep}ts={ts}"
 
 
+def _conditional_get(url: str) -> bytes:
+    """GET *url* (cache-busted), revalidating the last body via its ETag.
+
+    A 304 reply returns the cached body without transferring it again.
+    """
+    cached = _etag_cache.get(url)
+    extra = {"If-None-Match": cached[0]} if cached else None
+    req = _make_request(_nocache_url(url), extra)
+    try:
+        with urllib.request.urlopen(req, timeout=HTTP_TIMEOUT, context=_ssl_context()) as resp:
+            body = resp.read()
+            etag = resp.headers.get("ETag")
+    except urllib.error.HTTPError as e:
+        if e.code == 304 and cached:
+            return cached[1]
+        raise
+    if etag:
+        _etag_cache[url] = (etag, body)
+    else:
+        _etag_cache.pop(url, None)
+    return body
+
+
 def _fetch_latest_release() -> dict | None:
     """Fetch the latest GitHub Release metadata (with cache-busting)."""
-    req = _make_request(_nocache_url(RELEASES_URL))
     try:
-        with urllib.request.urlopen(req, timeout=HTTP_TIMEOUT, context=_ssl_context()) as resp:
-            return json.loads(resp.read().decode("utf-8"))
+        return json.loads(_conditional_get(RELEASES_URL).decode("utf-8"))
     except urllib.error.HTTPError as e:
         if e.code == 404:
             log.debug("No releases found (404).")
@@ -162,10 +185,8 @@ def _find_exe_asset(release: dict) -> dict | None:
 def _fetch_remote_version_via_raw() -> str | None:
     """Fallback: read VERSION from raw config.py on the branch
     (same approach as tools/updater.py)."""
-    req = _make_request(_nocache_url(RAW_CONFIG_URL))
     try:
-        with urllib.request.urlopen(req, timeout=HTTP_TIMEOUT, context=_ssl_context()) as resp:
-            data = resp.read().decode("utf-8", errors="ignore")
+        data = _conditional_get(RAW_CONFIG_URL).decode("utf-8", errors="ignore")
         m = _VERSION_LINE_RE.search(data)
         if m:
             return m.group(1)
@@ -404,13 +425,30 @@ def invalidate_update_cache():
     _update_info_cache_ts = 0.0
 
 
+# Held while an update is checked/applied.  The startup check (run.py,
+# background thread) and the in-app "update now" button both go through
+# check_for_update(); they must never swap the EXE concurrently.
+_update_lock = threading.Lock()
+
+
 def check_for_update() -> bool:
     """
     Check GitHub for a newer release and self-update if available.
 
     Returns True if an update was applied (caller should expect a
-    service restart shortly). Returns False otherwise.
+    service restart shortly). Returns False otherwise, including when
+    another update check is already running.
     """
+    if not _update_lock.acquire(blocking=False):
+        log.info("Update check already in progress — skipping.")
+        return False
+    try:
+        return _check_and_apply_update()
+    finally:
+        _update_lock.release()
+
+
+def _check_and_apply_update() -> bool:
     # Housekeeping: remove leftover from previous update
     _cleanup_old_exe()
 
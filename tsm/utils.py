@@ -60,7 +60,10 @@ def get_csrf_token():
 def validate_csrf():
     token = session.get("_csrf_token")
     form_token = request.form.get("_csrf_token")
-    if not token or not form_token or not hmac.compare_digest(token, form_token):
+    # compare_digest only accepts ASCII str, so compare the encoded bytes;
+    # a forged non-ASCII token must fail with 400, not a TypeError/500.
+    if not token or not form_token or not hmac.compare_digest(
+            token.encode(), form_token.encode()):
         abort(400, description="Ungültiges CSRF-Token.")
 
 